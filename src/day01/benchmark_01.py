@@ -0,0 +1,79 @@
+import tempfile
+from pathlib import Path
+from typing import List
+import numpy as np
+from shared.utils import time_call
+from day01.day01_solution import (
+    load_location_ids,
+    calculate_total_distance_vectorized,
+    calculate_similarity_score_vectorized,
+    calculate_total_distance_counting,
+    calculate_similarity_score_counting,
+    parse_location_ids,
+    calculate_total_distance,
+    calculate_similarity_score,
+)
+
+ROW_COUNTS: List[int] = [1_000_000, 10_000_000, 50_000_000]
+# The pure Python path is only timed up to this size, beyond it takes minutes
+REFERENCE_MAX_ROWS: int = 1_000_000
+ID_DIGITS: int = 5
+
+
+def write_synthetic_input(file_path: Path, rows: int, seed: int = 2024) -> None:
+    """
+    Writes `rows` lines of "XXXXX   YYYYY" location IDs, formatted by NumPy.
+
+    Args:
+        file_path (Path): Where to write the file.
+        rows (int): Number of rows to generate.
+        seed (int): Seed for the random generator.
+    """
+    rng = np.random.default_rng(seed)
+    low, high = 10 ** (ID_DIGITS - 1), 10**ID_DIGITS
+    ids = rng.integers(low, high, size=(rows, 2), dtype=np.int64)
+
+    # Every row is laid out as: 5 digits, 3 spaces, 5 digits, newline
+    line_width = 2 * ID_DIGITS + 4
+    buffer = np.full((rows, line_width), ord(" "), dtype=np.uint8)
+    powers = 10 ** np.arange(ID_DIGITS - 1, -1, -1, dtype=np.int64)
+    for column, offset in enumerate((0, ID_DIGITS + 3)):
+        digits = ids[:, column, None] // powers % 10
+        buffer[:, offset : offset + ID_DIGITS] = digits + ord("0")
+    buffer[:, -1] = ord("\n")
+    buffer.tofile(file_path)
+
+
+def solve_vectorized(file_path: Path) -> int:
+    left, right = load_location_ids(file_path)
+    calculate_total_distance_vectorized(left, right)
+    return calculate_similarity_score_vectorized(left, right)
+
+
+def solve_counting(file_path: Path) -> int:
+    left, right = load_location_ids(file_path)
+    calculate_total_distance_counting(left, right)
+    return calculate_similarity_score_counting(left, right)
+
+
+def solve_reference(file_path: Path) -> int:
+    with file_path.open("r") as file:
+        left, right = parse_location_ids(file.read().splitlines())
+    calculate_similarity_score(left, right)
+    return calculate_total_distance(left, right)
+
+
+if __name__ == "__main__":
+    with tempfile.TemporaryDirectory() as temp_dir:
+        for rows in ROW_COUNTS:
+            input_file = Path(temp_dir) / f"input_{rows}.txt"
+            write_synthetic_input(input_file, rows)
+
+            seconds = time_call(lambda: solve_vectorized(input_file))
+            print(f"{rows:>12,} rows | vectorized: {rows / seconds:>14,.0f} rows/s")
+            seconds = time_call(lambda: solve_counting(input_file))
+            print(f"{rows:>12,} rows | counting:   {rows / seconds:>14,.0f} rows/s")
+            if rows <= REFERENCE_MAX_ROWS:
+                seconds = time_call(lambda: solve_reference(input_file))
+                print(f"{rows:>12,} rows | reference:  {rows / seconds:>14,.0f} rows/s")
+            input_file.unlink()
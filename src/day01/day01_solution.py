@@ -1,6 +1,13 @@
+from array import array
 from collections import Counter
+from contextlib import ExitStack
+from itertools import zip_longest
 from pathlib import Path
-from typing import List, Tuple
+from typing import BinaryIO, Iterable, Iterator, List, Optional, Tuple
+import heapq
+import tempfile
+import warnings
+import numpy as np
 from shared.utils import parse_input
 
 
@@ -23,22 +30,230 @@ def parse_location_ids(data: List[str]) -> Tuple[List[int], List[int]]:
     return left, right
 
 
-def calculate_total_distance(left: List[int], right: List[int]) -> int:
+def _load_columns(source: str | Path | List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses whitespace-separated location ID pairs into two int64 columns.
+
+    Args:
+        source (str | Path | List[str]): A file path or already loaded input lines.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The left and right columns as int64 arrays,
+            both empty if the input holds no rows.
+
+    Raises:
+        ValueError: If a row does not contain exactly two location IDs.
+    """
+    with warnings.catch_warnings():
+        # Empty input is a valid, empty list of pairs rather than a mistake
+        warnings.filterwarnings("ignore", "loadtxt: input contained no data")
+        pairs = np.loadtxt(source, dtype=np.int64, ndmin=2)
+    if pairs.size == 0:
+        return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64)
+    if pairs.shape[1] != 2:
+        raise ValueError("Each row must contain exactly two location IDs")
+    return np.ascontiguousarray(pairs[:, 0]), np.ascontiguousarray(pairs[:, 1])
+
+
+def load_location_ids(file_path: str | Path) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Reads a location ID file straight into two int64 arrays.
+
+    The file is parsed by NumPy's C reader, so no Python object is created per row.
+
+    Args:
+        file_path (str | Path): Path to the input file.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The left and right columns of location IDs.
+    """
+    return _load_columns(file_path)
+
+
+def parse_location_ids_array(data: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses already loaded input lines into two int64 arrays.
+
+    Args:
+        data (List[str]): List of input lines.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The left and right columns of location IDs.
+    """
+    return _load_columns(data)
+
+
+def calculate_total_distance(
+    left: List[int], right: List[int], inplace: bool = True
+) -> int:
     """
     Calculates the total distance between two lists of integers.
 
     Args:
         left (List[int]): The first list of integers.
         right (List[int]): The second list of integers.
+        inplace (bool): If True, sorts the given lists in place. If False, sorts
+            copies and leaves the caller's lists unmodified.
 
     Returns:
         int: The total distance between paired integers.
     """
-    left.sort()
-    right.sort()
+    if inplace:
+        left.sort()
+        right.sort()
+    else:
+        left, right = sorted(left), sorted(right)
     return sum(abs(a - b) for a, b in zip(left, right))
 
 
+# Location IDs are spilled to disk as native signed 64-bit integers
+RUN_TYPECODE = "q"
+
+
+def _write_run(values: List[int], directory: str) -> BinaryIO:
+    """
+    Sorts a buffer of values and spills it to an anonymous temporary file.
+
+    Args:
+        values (List[int]): The buffered values. Sorted in place.
+        directory (str): Directory in which to create the run file.
+
+    Returns:
+        BinaryIO: The run file, rewound to its start.
+    """
+    values.sort()
+    run = tempfile.TemporaryFile(dir=directory)
+    array(RUN_TYPECODE, values).tofile(run)
+    run.seek(0)
+    return run
+
+
+def _read_run(run: BinaryIO, block_size: int) -> Iterator[int]:
+    """
+    Streams the values of a run file back, `block_size` values at a time.
+    """
+    while True:
+        block = array(RUN_TYPECODE)
+        try:
+            block.fromfile(run, block_size)
+        except EOFError:
+            # The final block is shorter than `block_size`, but still filled
+            pass
+        if not block:
+            return
+        yield from block
+
+
+def _spill_sorted_runs(
+    pairs: Iterable[Tuple[Optional[int], Optional[int]]],
+    run_size: int,
+    directory: str,
+) -> Tuple[List[BinaryIO], List[BinaryIO]]:
+    """
+    Splits a stream of (left, right) pairs into sorted runs spilled to disk.
+
+    Each column is buffered and spilled on its own, and a None stands for a column
+    that has already run out, so columns of different lengths are sorted in full.
+    At most `run_size` values per column are held in memory at any time.
+
+    Returns:
+        Tuple[List[BinaryIO], List[BinaryIO]]: The left and right run files.
+    """
+    runs: Tuple[List[BinaryIO], List[BinaryIO]] = ([], [])
+    buffers: Tuple[List[int], List[int]] = ([], [])
+
+    for pair in pairs:
+        for value, buffer, column_runs in zip(pair, buffers, runs):
+            if value is None:
+                continue
+            buffer.append(value)
+            if len(buffer) >= run_size:
+                column_runs.append(_write_run(buffer, directory))
+                buffer.clear()
+
+    for buffer, column_runs in zip(buffers, runs):
+        if buffer:
+            column_runs.append(_write_run(buffer, directory))
+    return runs
+
+
+def _external_distance(
+    pairs: Iterable[Tuple[Optional[int], Optional[int]]],
+    max_values_in_memory: int,
+    temp_dir: Optional[str] = None,
+) -> int:
+    """
+    Spills a stream of (left, right) pairs to sorted runs and merges them back.
+
+    As in `calculate_total_distance`, the columns are sorted before they are paired,
+    so extra IDs in the longer column are left over after sorting.
+    """
+    if max_values_in_memory < 1:
+        raise ValueError("max_values_in_memory must be positive")
+
+    with ExitStack() as stack:
+        left_runs, right_runs = _spill_sorted_runs(
+            pairs, max_values_in_memory, temp_dir
+        )
+        for run in left_runs + right_runs:
+            stack.enter_context(run)
+
+        # Split the read-ahead budget between the runs being merged
+        run_count = max(1, len(left_runs), len(right_runs))
+        block_size = max(1, max_values_in_memory // run_count)
+        left_sorted = heapq.merge(*(_read_run(run, block_size) for run in left_runs))
+        right_sorted = heapq.merge(*(_read_run(run, block_size) for run in right_runs))
+        return sum(abs(a - b) for a, b in zip(left_sorted, right_sorted))
+
+
+def calculate_total_distance_external(
+    left: Iterable[int],
+    right: Iterable[int],
+    max_values_in_memory: int = 1_000_000,
+    temp_dir: Optional[str] = None,
+) -> int:
+    """
+    Calculates the total distance with an external merge sort, for very large columns.
+
+    Both columns are consumed as streams, cut into sorted runs that are spilled to
+    temporary files, and then k-way merged with `heapq.merge` while the distance is
+    accumulated. The inputs are never mutated. Columns of different lengths are
+    sorted in full before pairing, matching `calculate_total_distance`.
+
+    Args:
+        left (Iterable[int]): The first column of location IDs.
+        right (Iterable[int]): The second column of location IDs.
+        max_values_in_memory (int): Peak number of buffered values per column. It
+            bounds both the run size while spilling and the read-ahead while merging.
+        temp_dir (Optional[str]): Directory for the run files. Defaults to the system
+            one.
+
+    Returns:
+        int: The total distance between paired integers.
+
+    Raises:
+        ValueError: If `max_values_in_memory` is not positive.
+    """
+    return _external_distance(zip_longest(left, right), max_values_in_memory, temp_dir)
+
+
+def iter_location_ids(file_path: str | Path) -> Iterator[Tuple[int, int]]:
+    """
+    Lazily yields (left, right) location ID pairs from a file, one line at a time.
+
+    Args:
+        file_path (str | Path): Path to the input file.
+
+    Yields:
+        Tuple[int, int]: One pair of location IDs per non-empty line.
+    """
+    with open(file_path, "r") as file:
+        for line in file:
+            if line.strip():
+                a, b = map(int, line.split())
+                yield a, b
+
+
 def calculate_similarity_score(left: List[int], right: List[int]) -> int:
     """
     Calculates the similarity score for Part 2.
@@ -54,6 +269,184 @@ def calculate_similarity_score(left: List[int], right: List[int]) -> int:
     return sum(num * right_counts[num] for num in left)
 
 
+def calculate_total_distance_vectorized(left: np.ndarray, right: np.ndarray) -> int:
+    """
+    Vectorized equivalent of `calculate_total_distance`.
+
+    Sorts copies of both columns, so the caller's arrays are left untouched. As with
+    `zip`, extra IDs in the longer column are ignored.
+
+    Args:
+        left (np.ndarray): The first column of location IDs.
+        right (np.ndarray): The second column of location IDs.
+
+    Returns:
+        int: The total distance between paired integers.
+    """
+    size = min(len(left), len(right))
+    left_sorted = np.sort(left)[:size]
+    right_sorted = np.sort(right)[:size]
+    return int(np.abs(left_sorted - right_sorted).sum())
+
+
+def calculate_similarity_score_vectorized(left: np.ndarray, right: np.ndarray) -> int:
+    """
+    Vectorized equivalent of `calculate_similarity_score`.
+
+    Counts each distinct right-hand ID with `np.unique` and looks up every left-hand
+    ID with `np.searchsorted` instead of building a `Counter`.
+
+    Args:
+        left (np.ndarray): The first column of location IDs.
+        right (np.ndarray): The second column of location IDs.
+
+    Returns:
+        int: The similarity score.
+    """
+    left = np.asarray(left, dtype=np.int64)
+    values, counts = np.unique(right, return_counts=True)
+    if values.size == 0:
+        return 0
+
+    # Clip so IDs larger than every right-hand value still index safely
+    positions = np.minimum(np.searchsorted(values, left), values.size - 1)
+    matches = np.where(values[positions] == left, counts[positions], 0)
+    return int((left * matches).sum())
+
+
+# Histograms are only used while the ID span is at most this many slots per ID
+MAX_HISTOGRAM_SPAN_RATIO: float = 4.0
+
+
+def _histogram_bounds(
+    left: np.ndarray,
+    right: np.ndarray,
+    id_range: Optional[Tuple[int, int]],
+    max_span_ratio: float,
+) -> Optional[Tuple[int, int]]:
+    """
+    Picks the (low, high) histogram bounds, or None if they would be too sparse.
+
+    Args:
+        left (np.ndarray): The first column of location IDs.
+        right (np.ndarray): The second column of location IDs.
+        id_range (Optional[Tuple[int, int]]): Known inclusive ID bounds, if any.
+        max_span_ratio (float): Largest accepted ratio of histogram slots to IDs.
+
+    Returns:
+        Optional[Tuple[int, int]]: The inclusive bounds, or None to fall back to
+            sorting.
+
+    Raises:
+        ValueError: If an ID lies outside the given `id_range`.
+    """
+    if left.size == 0 or right.size == 0:
+        return None
+    smallest = int(min(left.min(), right.min()))
+    largest = int(max(left.max(), right.max()))
+    if id_range is None:
+        id_range = (smallest, largest)
+    low, high = id_range
+    if smallest < low or largest > high:
+        raise ValueError(
+            f"Location IDs span [{smallest}, {largest}], outside id_range {id_range}"
+        )
+    if high - low + 1 > max_span_ratio * (left.size + right.size):
+        return None
+    return low, high
+
+
+def _histograms(
+    left: np.ndarray, right: np.ndarray, low: int, high: int
+) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Builds one frequency table per column, where slot `i` counts the ID `low + i`.
+    """
+    span = high - low + 1
+    return (
+        np.bincount(left - low, minlength=span),
+        np.bincount(right - low, minlength=span),
+    )
+
+
+def calculate_total_distance_counting(
+    left: np.ndarray,
+    right: np.ndarray,
+    id_range: Optional[Tuple[int, int]] = None,
+    max_span_ratio: float = MAX_HISTOGRAM_SPAN_RATIO,
+) -> int:
+    """
+    Calculates the total distance in O(n + span) with histograms instead of sorting.
+
+    Walking both histograms in order pairs the k-th smallest IDs of each column, so
+    every unit step between consecutive IDs is crossed by exactly as many pairs as the
+    columns' cumulative counts differ there. The distance is therefore the sum of
+    |cumsum(left_hist) - cumsum(right_hist)| over all slots.
+
+    Falls back to `calculate_total_distance_vectorized` when the columns differ in
+    length or the ID span is too sparse for a histogram.
+
+    Args:
+        left (np.ndarray): The first column of location IDs.
+        right (np.ndarray): The second column of location IDs.
+        id_range (Optional[Tuple[int, int]]): Known inclusive ID bounds. Detected with
+            min/max when omitted.
+        max_span_ratio (float): Largest accepted ratio of histogram slots to IDs.
+
+    Returns:
+        int: The total distance between paired integers.
+
+    Raises:
+        ValueError: If an ID lies outside the given `id_range`.
+    """
+    left = np.asarray(left, dtype=np.int64)
+    right = np.asarray(right, dtype=np.int64)
+    bounds = _histogram_bounds(left, right, id_range, max_span_ratio)
+    if bounds is None or left.size != right.size:
+        return calculate_total_distance_vectorized(left, right)
+
+    left_counts, right_counts = _histograms(left, right, *bounds)
+    gaps = np.cumsum(left_counts) - np.cumsum(right_counts)
+    return int(np.abs(gaps).sum())
+
+
+def calculate_similarity_score_counting(
+    left: np.ndarray,
+    right: np.ndarray,
+    id_range: Optional[Tuple[int, int]] = None,
+    max_span_ratio: float = MAX_HISTOGRAM_SPAN_RATIO,
+) -> int:
+    """
+    Calculates the similarity score as a dot product of the two columns' histograms.
+
+    Falls back to `calculate_similarity_score_vectorized` when the ID span is too
+    sparse for a histogram.
+
+    Args:
+        left (np.ndarray): The first column of location IDs.
+        right (np.ndarray): The second column of location IDs.
+        id_range (Optional[Tuple[int, int]]): Known inclusive ID bounds. Detected with
+            min/max when omitted.
+        max_span_ratio (float): Largest accepted ratio of histogram slots to IDs.
+
+    Returns:
+        int: The similarity score.
+
+    Raises:
+        ValueError: If an ID lies outside the given `id_range`.
+    """
+    left = np.asarray(left, dtype=np.int64)
+    right = np.asarray(right, dtype=np.int64)
+    bounds = _histogram_bounds(left, right, id_range, max_span_ratio)
+    if bounds is None:
+        return calculate_similarity_score_vectorized(left, right)
+
+    low, high = bounds
+    left_counts, right_counts = _histograms(left, right, low, high)
+    ids = np.arange(low, high + 1, dtype=np.int64)
+    return int(np.dot(ids * left_counts, right_counts))
+
+
 def part1(data: List[str]) -> int:
     left, right = parse_location_ids(data)
     return calculate_total_distance(left, right)
@@ -64,6 +457,23 @@ def part2(data: List[str]) -> int:
     return calculate_similarity_score(left, right)
 
 
+def part1_external(file_path: str | Path, max_values_in_memory: int = 1_000_000) -> int:
+    """
+    Solve part 1 for an input file too large to load, using the external merge sort.
+    """
+    return _external_distance(iter_location_ids(file_path), max_values_in_memory)
+
+
+def part1_vectorized(data: List[str]) -> int:
+    left, right = parse_location_ids_array(data)
+    return calculate_total_distance_vectorized(left, right)
+
+
+def part2_vectorized(data: List[str]) -> int:
+    left, right = parse_location_ids_array(data)
+    return calculate_similarity_score_vectorized(left, right)
+
+
 if __name__ == "__main__":
     current_dir: Path = Path(__file__).parent
     input_file: Path = current_dir / "input.txt"
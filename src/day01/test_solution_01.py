@@ -1,11 +1,24 @@
+from pathlib import Path
 from typing import List, Tuple
+import random
+import numpy as np
 import pytest
 from .day01_solution import (
     part1,
     part2,
+    part1_vectorized,
+    part2_vectorized,
+    part1_external,
     parse_location_ids,
+    parse_location_ids_array,
+    load_location_ids,
     calculate_total_distance,
     calculate_similarity_score,
+    calculate_total_distance_vectorized,
+    calculate_similarity_score_vectorized,
+    calculate_total_distance_external,
+    calculate_total_distance_counting,
+    calculate_similarity_score_counting,
 )
 
 
@@ -38,3 +51,133 @@ def test_part1() -> None:
 def test_part2() -> None:
     example_input: List[str] = ["3 4", "4 3", "2 5", "1 3", "3 9", "3 3"]
     assert part2(example_input) == 31
+
+
+def test_load_location_ids(tmp_path: Path) -> None:
+    input_file: Path = tmp_path / "input.txt"
+    input_file.write_text("3   4\n4   3\n2   5\n1   3\n3   9\n3   3\n")
+    left, right = load_location_ids(input_file)
+    assert left.tolist() == [3, 4, 2, 1, 3, 3]
+    assert right.tolist() == [4, 3, 5, 3, 9, 3]
+
+
+def test_parse_location_ids_array_rejects_odd_columns() -> None:
+    with pytest.raises(ValueError):
+        parse_location_ids_array(["3 4", "4"])
+
+
+def test_empty_input(tmp_path: Path) -> None:
+    input_file: Path = tmp_path / "input.txt"
+    input_file.write_text("")
+    left, right = load_location_ids(input_file)
+    assert left.tolist() == right.tolist() == []
+    assert left.dtype == right.dtype == np.int64
+    assert part1_vectorized([]) == part1([]) == 0
+    assert part2_vectorized([]) == part2([]) == 0
+
+
+def test_vectorized_parts() -> None:
+    example_input: List[str] = ["3 4", "4 3", "2 5", "1 3", "3 9", "3 3"]
+    assert part1_vectorized(example_input) == 11
+    assert part2_vectorized(example_input) == 31
+
+
+def test_vectorized_matches_reference() -> None:
+    rng = random.Random(2024)
+    left: List[int] = [rng.randint(10000, 99999) for _ in range(2000)]
+    right: List[int] = [rng.choice(left) for _ in range(2000)]
+    left_array = np.array(left, dtype=np.int64)
+    right_array = np.array(right, dtype=np.int64)
+
+    assert calculate_similarity_score_vectorized(
+        left_array, right_array
+    ) == calculate_similarity_score(left, right)
+    assert calculate_total_distance_vectorized(
+        left_array, right_array
+    ) == calculate_total_distance(left, right)
+    # The vectorized path sorts copies, not the caller's arrays
+    assert left_array.tolist() != sorted(left)
+
+
+def test_calculate_total_distance_not_inplace() -> None:
+    left: List[int] = [3, 4, 2, 1, 3, 3]
+    right: List[int] = [4, 3, 5, 3, 9, 3]
+    assert calculate_total_distance(left, right, inplace=False) == 11
+    assert left == [3, 4, 2, 1, 3, 3]
+    assert right == [4, 3, 5, 3, 9, 3]
+
+
+@pytest.mark.parametrize("max_values_in_memory", [3, 16, 1000])
+def test_calculate_total_distance_external(
+    max_values_in_memory: int, tmp_path: Path
+) -> None:
+    rng = random.Random(max_values_in_memory)
+    left: List[int] = [rng.randint(-50, 10**12) for _ in range(500)]
+    right: List[int] = [rng.randint(-50, 10**12) for _ in range(500)]
+    left_copy, right_copy = list(left), list(right)
+
+    result = calculate_total_distance_external(
+        left, right, max_values_in_memory, temp_dir=str(tmp_path)
+    )
+    assert result == calculate_total_distance(left, right, inplace=False)
+    assert (left, right) == (left_copy, right_copy)
+    # Run files are removed once the merge is done
+    assert not any(tmp_path.iterdir())
+
+
+@pytest.mark.parametrize("max_values_in_memory", [1, 2, 1000])
+def test_calculate_total_distance_external_uneven(max_values_in_memory: int) -> None:
+    # Each column is sorted in full before the pairs are formed
+    assert calculate_total_distance_external([5, 1], [1], max_values_in_memory) == 0
+    assert calculate_total_distance_external([1], [5, 1], max_values_in_memory) == 0
+    assert calculate_total_distance_external(
+        [9, 8, 7, 1], [2, 1], max_values_in_memory
+    ) == calculate_total_distance([9, 8, 7, 1], [2, 1])
+
+
+def test_part1_external(tmp_path: Path) -> None:
+    input_file: Path = tmp_path / "input.txt"
+    input_file.write_text("3   4\n4   3\n2   5\n1   3\n3   9\n3   3\n")
+    assert part1_external(input_file, max_values_in_memory=2) == 11
+
+
+@pytest.mark.parametrize(
+    "low, high, size",
+    [
+        (10000, 99999, 50000),  # Dense enough for histograms
+        (0, 10**9, 500),  # Too sparse, falls back to sorting
+        (-20, 20, 300),  # Negative IDs
+    ],
+)
+def test_counting_matches_reference(low: int, high: int, size: int) -> None:
+    rng = random.Random(size)
+    left: List[int] = [rng.randint(low, high) for _ in range(size)]
+    right: List[int] = [rng.randint(low, high) for _ in range(size)]
+    left_array = np.array(left, dtype=np.int64)
+    right_array = np.array(right, dtype=np.int64)
+
+    assert calculate_similarity_score_counting(
+        left_array, right_array
+    ) == calculate_similarity_score(left, right)
+    assert calculate_total_distance_counting(
+        left_array, right_array
+    ) == calculate_total_distance(left, right)
+
+
+def test_counting_with_known_range() -> None:
+    left = np.array([3, 4, 2, 1, 3, 3])
+    right = np.array([4, 3, 5, 3, 9, 3])
+    assert calculate_total_distance_counting(left, right, id_range=(0, 9)) == 11
+    assert calculate_similarity_score_counting(left, right, id_range=(0, 9)) == 31
+    # Uneven columns are paired like `zip` does, through the sorting fallback
+    assert calculate_total_distance_counting(left, right[:4]) == 6
+
+
+@pytest.mark.parametrize("id_range", [(2, 9), (0, 8), (4, 5)])
+def test_counting_rejects_ids_outside_range(id_range: Tuple[int, int]) -> None:
+    left = np.array([3, 4, 2, 1, 3, 3])
+    right = np.array([4, 3, 5, 3, 9, 3])
+    with pytest.raises(ValueError):
+        calculate_total_distance_counting(left, right, id_range=id_range)
+    with pytest.raises(ValueError):
+        calculate_similarity_score_counting(left, right, id_range=id_range)
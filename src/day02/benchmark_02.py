@@ -0,0 +1,60 @@
+from typing import List
+import numpy as np
+from shared.utils import time_call
+from day02.day02_solution import (
+    part1,
+    part2,
+    part1_vectorized,
+    part2_vectorized,
+    pack_reports,
+    count_safe_reports_batch,
+    count_safe_reports_with_removal_batch,
+)
+
+REPORT_COUNT: int = 1_000_000
+
+
+def generate_reports(count: int, seed: int = 2024) -> List[str]:
+    """
+    Generates `count` reports of 5 to 8 levels, mostly safe with occasional bad steps.
+
+    Args:
+        count (int): Number of reports to generate.
+        seed (int): Seed for the random generator.
+
+    Returns:
+        List[str]: The reports as input lines.
+    """
+    rng = np.random.default_rng(seed)
+    steps = rng.choice([1, 2, 3, 1, 2, 3, 0, 4], size=(count, 7))
+    directions = rng.choice([1, -1], size=(count, 1))
+    levels = 50 + np.cumsum(np.hstack([np.zeros((count, 1), int), steps]), axis=1)
+    levels = 50 + (levels - 50) * directions
+    lengths = rng.integers(5, 9, size=count)
+    return [" ".join(map(str, row[:length])) for row, length in zip(levels, lengths)]
+
+
+if __name__ == "__main__":
+    data = generate_reports(REPORT_COUNT)
+    for name, reference, vectorized in [
+        ("Part 1", part1, part1_vectorized),
+        ("Part 2", part2, part2_vectorized),
+    ]:
+        loop_seconds = time_call(lambda: reference(data))
+        batch_seconds = time_call(lambda: vectorized(data))
+        print(
+            f"{name}: loop {REPORT_COUNT / loop_seconds:>12,.0f} reports/s | "
+            f"batch {REPORT_COUNT / batch_seconds:>12,.0f} reports/s | "
+            f"speedup {loop_seconds / batch_seconds:.1f}x"
+        )
+
+    # Parsing dominates the batch path, so also time the evaluation on its own
+    reports, lengths = pack_reports(data)
+    pack_seconds = time_call(lambda: pack_reports(data))
+    print(f"Packing: {REPORT_COUNT / pack_seconds:>12,.0f} reports/s")
+    for name, evaluate in [
+        ("Part 1", count_safe_reports_batch),
+        ("Part 2", count_safe_reports_with_removal_batch),
+    ]:
+        seconds = time_call(lambda: evaluate(reports, lengths))
+        print(f"{name} evaluation only: {REPORT_COUNT / seconds:>12,.0f} reports/s")
@@ -1,25 +1,86 @@
 from pathlib import Path
-from typing import List
+from typing import List, Tuple
+import numpy as np
 from shared.utils import parse_input
 
 
+def _is_safe_step(a: int, b: int, direction: int) -> bool:
+    """Check if moving from level `a` to `b` is a safe step in the given direction."""
+    return 1 <= (b - a) * direction <= 3
+
+
 def is_safe(report: List[int]) -> bool:
     """Check if a report is safe based on the rules."""
     if len(report) < 2:
         return False
 
-    # Compute differences between adjacent levels
-    diffs = [abs(report[i] - report[i + 1]) for i in range(len(report) - 1)]
+    # The first step decides whether the report must keep increasing or decreasing
+    direction = 1 if report[1] > report[0] else -1
 
-    # Rule: All differences must be within [1, 3]
-    if not all(1 <= d <= 3 for d in diffs):
-        return False
+    # Rule: Every step must move in that direction by 1 to 3 levels
+    previous = report[0]
+    for level in report[1:]:
+        if not _is_safe_step(previous, level, direction):
+            return False
+        previous = level
+    return True
+
+
+def _min_removals(report: List[int], direction: int, max_removals: int) -> int:
+    """
+    Find the fewest levels to remove so that the report is safe in one direction.
 
-    # Rule: The report must be strictly increasing or decreasing
-    is_increasing = all(report[i] < report[i + 1] for i in range(len(report) - 1))
-    is_decreasing = all(report[i] > report[i + 1] for i in range(len(report) - 1))
+    Dynamic programming over the levels: `removed[j]` is the fewest removals that leave
+    a safe run ending at level `j`. A kept level can only follow one of the previous
+    `max_removals + 1` levels, since skipping more would already exceed the budget,
+    so the whole pass takes O(n * k) time.
+
+    Args:
+        report (List[int]): A single report represented as a list of integers.
+        direction (int): 1 for an increasing report, -1 for a decreasing one.
+        max_removals (int): The removal budget `k`.
+
+    Returns:
+        int: The fewest removals needed, or any value above `max_removals` if the
+            report cannot be made safe within the budget.
+    """
+    n = len(report)
+    removed: List[int] = []
+    best = n
+    for j, level in enumerate(report):
+        # Starting the run at level `j` removes every level before it
+        fewest = j
+        for i in range(max(0, j - max_removals - 1), j):
+            candidate = removed[i] + (j - i - 1)
+            if candidate < fewest and _is_safe_step(report[i], level, direction):
+                fewest = candidate
+        removed.append(fewest)
+        # Ending the run at level `j` removes every level after it
+        best = min(best, fewest + (n - 1 - j))
+    return best
+
+
+def is_safe_with_removals(report: List[int], max_removals: int) -> bool:
+    """
+    Check if a report can be made safe by removing at most `max_removals` levels.
+
+    Runs in O(n * k) time and O(n) memory, so it stays linear for a fixed `k`.
+
+    Args:
+        report (List[int]): A single report represented as a list of integers.
+        max_removals (int): The maximum number of levels that may be removed.
+
+    Returns:
+        bool: True if the report is safe after removing at most `max_removals` levels.
+    """
+    if len(report) <= max_removals + 1:
+        # Removing levels would leave 1 level or none, which counts as safe.
+        return max_removals > 0
 
-    return is_increasing or is_decreasing
+    return any(
+        _min_removals(report, direction, max_removals) <= max_removals
+        for direction in (1, -1)
+    )
 
 
 def can_be_safe_with_removal(report: List[int]) -> bool:
@@ -32,17 +93,170 @@ def can_be_safe_with_removal(report: List[int]) -> bool:
     Returns:
         bool: True if the report can be made safe by removing one level, False otherwise.
     """
-    if len(report) <= 2:
-        return (
-            True  # Removing one level would leave 1 or 2 levels, which is always safe.
-        )
+    return is_safe_with_removals(report, 1)
+
+
+# Bytes that may separate the levels of a report, or reports from each other
+SEPARATOR_CODES = tuple(b" \t\r\n")
+MAX_LEVEL_DIGITS = 18
+
+
+def _parse_levels(text: bytes) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Parses every integer of a text at once, with masks over its bytes.
+
+    Only the token boundaries are found per byte; the values are then accumulated one
+    digit column at a time, so the Python loop runs at most MAX_LEVEL_DIGITS times.
+
+    Args:
+        text (bytes): The encoded reports.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: The int64 values in text order, and the byte
+            offset where each one starts.
+
+    Raises:
+        ValueError: If the text holds anything but integers and whitespace.
+    """
+    codes = np.frombuffer(text, dtype=np.uint8)
+    # Bytes below "0" wrap around to large values, so one comparison finds digits
+    digit_values = codes - ord("0")
+    is_digit = digit_values <= 9
+    is_minus = codes == ord("-")
+    is_token = is_digit | is_minus
+    is_separator = codes == SEPARATOR_CODES[0]
+    for code in SEPARATOR_CODES[1:]:
+        is_separator |= codes == code
+    if not np.all(is_token | is_separator):
+        raise ValueError("Reports may only hold integers separated by whitespace")
+
+    # Token boundaries alternate between starts and ends
+    in_token = np.concatenate(([False], is_token, [False]))
+    boundaries = np.flatnonzero(in_token[1:] != in_token[:-1])
+    starts, ends = boundaries[0::2], boundaries[1::2]
+    signed = is_minus[starts]
+    if np.count_nonzero(is_minus) != np.count_nonzero(signed):
+        raise ValueError("A minus sign may only start a level")
+    digit_counts = ends - starts - signed
+    if np.any((digit_counts < 1) | (digit_counts > MAX_LEVEL_DIGITS)):
+        raise ValueError(f"Levels must have 1 to {MAX_LEVEL_DIGITS} digits")
+
+    # Sum the digits column by column from the right, weighted by place value; a
+    # column only needs masking once it runs past the shortest level
+    np.putmask(digit_values, ~is_digit, 0)
+    last_digits = ends - 1
+    values = np.zeros(starts.size, dtype=np.int64)
+    shortest = int(digit_counts.min(initial=0))
+    for column in range(int(digit_counts.max(initial=0))):
+        place_values = digit_values[last_digits - column] * np.int64(10**column)
+        if column >= shortest:
+            place_values[digit_counts <= column] = 0
+        values += place_values
+    return np.where(signed, -values, values), starts
+
+
+def pack_reports(data: List[str]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Packs all reports into one padded 2-D array.
+
+    The lines are joined and encoded once, then parsed by vectorized masks over the
+    bytes, so no Python code runs per level or per report. The levels of each report
+    are counted by binary-searching its newline among the level offsets.
+
+    Args:
+        data (List[str]): The input data as a list of strings.
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: A (reports, max_length) int64 array of levels,
+            zero-padded on the right, and the length of each report.
+
+    Raises:
+        ValueError: If a report holds anything but whitespace-separated integers.
+    """
+    text = "\n".join(data).encode()
+    levels, starts = _parse_levels(text)
+    newlines = np.flatnonzero(np.frombuffer(text, dtype=np.uint8) == ord("\n"))
+    # The levels of each report lie between the newlines around it
+    bounds = np.searchsorted(starts, newlines)
+    lengths = np.diff(bounds, prepend=0, append=starts.size) if data else bounds
+
+    width = int(lengths.max()) if lengths.size else 0
+    reports = np.zeros((lengths.size, width), dtype=np.int64)
+    # Row-major boolean indexing fills each row's leading cells in input order
+    reports[np.arange(width) < lengths[:, None]] = levels
+    return reports, lengths
+
+
+def _safe_steps(reports: np.ndarray, lengths: np.ndarray, gap: int) -> np.ndarray:
+    """
+    Flag, for both directions, which steps of `gap` levels are safe in every report.
+
+    Steps that reach past the end of a report count as safe, so padding never breaks
+    the AND-accumulations done on the result.
+
+    Returns:
+        np.ndarray: A (2, reports, max_length - gap) boolean array, where the first
+            axis is the increasing and the decreasing direction.
+    """
+    steps = reports[:, gap:] - reports[:, :-gap]
+    padding = np.arange(gap, reports.shape[1]) >= lengths[:, None]
+    directions = np.array([1, -1])[:, None, None]
+    oriented = steps[None] * directions
+    return ((oriented >= 1) & (oriented <= 3)) | padding[None]
+
+
+def count_safe_reports_batch(reports: np.ndarray, lengths: np.ndarray) -> int:
+    """
+    Count the safe reports in a packed batch with a handful of vectorized operations.
+
+    Args:
+        reports (np.ndarray): Padded levels, as returned by `pack_reports`.
+        lengths (np.ndarray): The length of each report.
+
+    Returns:
+        int: The number of safe reports.
+    """
+    if reports.shape[1] < 2:
+        return 0
+    safe = _safe_steps(reports, lengths, 1).all(axis=2).any(axis=0)
+    return int((safe & (lengths >= 2)).sum())
+
+
+def count_safe_reports_with_removal_batch(
+    reports: np.ndarray, lengths: np.ndarray
+) -> int:
+    """
+    Count the reports that are safe after removing at most one level, in batch.
+
+    Removing level `j` leaves a safe report when every step before `j - 1` is safe,
+    every step after `j + 1` is safe, and the step bridging `j - 1` to `j + 1` is safe.
+    Prefix and suffix AND-accumulations give the first two for every `j` at once.
+
+    Args:
+        reports (np.ndarray): Padded levels, as returned by `pack_reports`.
+        lengths (np.ndarray): The length of each report.
+
+    Returns:
+        int: The number of reports that are safe after at most one removal.
+    """
+    count, width = reports.shape
+    if width < 3:
+        # Removing a level would leave 1 level or none, which counts as safe.
+        return count
+
+    steps = _safe_steps(reports, lengths, 1)
+    prefix = np.logical_and.accumulate(steps, axis=2)
+    suffix = np.logical_and.accumulate(steps[:, :, ::-1], axis=2)[:, :, ::-1]
+    always = np.ones((2, count, 1), dtype=bool)
 
-    for i in range(len(report)):
-        # Create a new report with one level removed
-        modified_report = report[:i] + report[i + 1 :]
-        if is_safe(modified_report):
-            return True
-    return False
+    # Removing level j keeps steps 0..j-2 and j+1..length-2
+    before = np.concatenate([always, always, prefix[:, :, :-1]], axis=2)
+    after = np.concatenate([suffix[:, :, 1:], always, always], axis=2)
+    # Bridge from j - 1 to j + 1; removing the first level needs no bridge
+    bridge = np.concatenate([always, _safe_steps(reports, lengths, 2), always], axis=2)
+
+    removable = (before & after & bridge).any(axis=2).any(axis=0)
+    return int((removable | (lengths <= 2)).sum())
 
 
 def part1(data: List[str]) -> int:
@@ -72,9 +286,21 @@ def part2(data: List[str]) -> int:
         int: The solution to part 2.
     """
     reports = [list(map(int, line.split())) for line in data]
-    return sum(
-        1 for report in reports if is_safe(report) or can_be_safe_with_removal(report)
-    )
+    return sum(1 for report in reports if is_safe_with_removals(report, 1))
+
+
+def part1_vectorized(data: List[str]) -> int:
+    """
+    Solve part 1 by evaluating all reports at once with NumPy.
+    """
+    return count_safe_reports_batch(*pack_reports(data))
+
+
+def part2_vectorized(data: List[str]) -> int:
+    """
+    Solve part 2 by evaluating all reports and their single removals at once with NumPy.
+    """
+    return count_safe_reports_with_removal_batch(*pack_reports(data))
 
 
 if __name__ == "__main__":
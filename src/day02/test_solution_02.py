@@ -1,5 +1,17 @@
+from itertools import combinations
+from typing import List
+import random
 import pytest
-from .day02_solution import is_safe, can_be_safe_with_removal, part1, part2
+from .day02_solution import (
+    is_safe,
+    can_be_safe_with_removal,
+    is_safe_with_removals,
+    pack_reports,
+    part1,
+    part2,
+    part1_vectorized,
+    part2_vectorized,
+)
 
 
 @pytest.mark.parametrize(
@@ -38,6 +50,52 @@ def test_can_be_safe_with_removal(report, expected):
     assert can_be_safe_with_removal(report) == expected
 
 
+def brute_force_safe_with_removals(report: List[int], max_removals: int) -> bool:
+    """
+    Reference check that tries every way of removing up to `max_removals` levels.
+    """
+    if is_safe(report):
+        return True
+    if len(report) <= max_removals + 1:
+        return max_removals > 0
+    return any(
+        is_safe([level for i, level in enumerate(report) if i not in removed])
+        for count in range(1, max_removals + 1)
+        for removed in map(set, combinations(range(len(report)), count))
+    )
+
+
+@pytest.mark.parametrize("max_removals", [0, 1, 2, 3])
+def test_is_safe_with_removals_matches_brute_force(max_removals: int) -> None:
+    """
+    Test is_safe_with_removals against trying every removal on random reports.
+    """
+    rng = random.Random(max_removals)
+    for _ in range(500):
+        length = rng.randint(1, 9)
+        start = rng.randint(1, 50)
+        direction = rng.choice([1, -1])
+        report = [start]
+        for _ in range(length - 1):
+            # Mostly safe steps, with the occasional bad level
+            step = rng.choice([1, 2, 3, 1, 2, 3, 0, 4, -2, 7])
+            report.append(report[-1] + direction * step)
+
+        expected = brute_force_safe_with_removals(report, max_removals)
+        assert is_safe_with_removals(report, max_removals) == expected, report
+
+
+def test_is_safe_with_removals_long_report() -> None:
+    """
+    Test a long report with a few bad levels scattered through it.
+    """
+    report = list(range(1, 3001))
+    for index in (500, 1500, 2500):
+        report[index] = 0
+    assert is_safe_with_removals(report, 3) is True
+    assert is_safe_with_removals(report, 2) is False
+
+
 def test_part1(tmp_path):
     """
     Test part1 with example input data.
@@ -78,3 +136,77 @@ def test_part2(tmp_path):
 
     input_lines = input_data.strip().split("\n")
     assert part2(input_lines) == 4
+
+
+def test_pack_reports() -> None:
+    """
+    Test that reports of different lengths are packed and padded.
+    """
+    reports, lengths = pack_reports(["7 6 4", "1 2", "9 7 6 2 1"])
+    assert lengths.tolist() == [3, 2, 5]
+    assert reports.tolist() == [
+        [7, 6, 4, 0, 0],
+        [1, 2, 0, 0, 0],
+        [9, 7, 6, 2, 1],
+    ]
+
+
+def test_pack_reports_whitespace_and_signs() -> None:
+    """
+    Test that any whitespace separates levels and that signs and long levels parse.
+    """
+    reports, lengths = pack_reports(["-7  16\t4 ", "", "123456789012345678"])
+    assert lengths.tolist() == [3, 0, 1]
+    assert reports.tolist() == [[-7, 16, 4], [0, 0, 0], [123456789012345678, 0, 0]]
+
+
+@pytest.mark.parametrize(
+    "line",
+    [
+        "1 x",  # Not a number
+        "1-2",  # Minus inside a level
+        "- 3",  # Minus without digits
+        "--3",  # Doubled minus
+        "1" * 19,  # Too long for int64
+    ],
+)
+def test_pack_reports_rejects_invalid_levels(line: str) -> None:
+    """
+    Test that malformed levels raise instead of being misparsed.
+    """
+    with pytest.raises(ValueError):
+        pack_reports([line])
+
+
+def test_vectorized_matches_reference() -> None:
+    """
+    Test the batch evaluators against the per-report functions on random reports.
+    """
+    rng = random.Random(2024)
+    data = []
+    for _ in range(2000):
+        level = rng.randint(1, 99)
+        report = [level]
+        for _ in range(rng.randint(0, 8)):
+            level += rng.choice([1, 2, 3, -1, -2, -3, 0, 4, 5])
+            report.append(level)
+        data.append(" ".join(map(str, report)))
+
+    assert part1_vectorized(data) == part1(data)
+    assert part2_vectorized(data) == part2(data)
+
+
+def test_vectorized_example() -> None:
+    """
+    Test the batch evaluators with the example input data.
+    """
+    input_lines = [
+        "7 6 4 2 1",
+        "1 2 7 8 9",
+        "9 7 6 2 1",
+        "1 3 2 4 5",
+        "8 6 4 4 1",
+        "1 3 6 7 9",
+    ]
+    assert part1_vectorized(input_lines) == 2
+    assert part2_vectorized(input_lines) == 4
@@ -0,0 +1,105 @@
+import io
+import random
+import re
+from typing import List, Tuple
+from shared.utils import time_call
+from day03.day03_solution import (
+    extract_valid_state_mul_instructions,
+    scan_memory_stream,
+)
+
+# The previous pattern, with its lazy prefix in front of the alternation
+LEGACY_PATTERN = r"[^\s\(\)\[\]]*?(mul\((\d+),(\d+)\)|don\'t\(\)|do\(\))"
+# Tokens that almost look like instructions, to keep the regex engine retrying
+NEAR_MISSES: List[str] = [
+    "mul",
+    "mu",
+    "mull",
+    "do",
+    "don",
+    "don't",
+    "dont",
+    "mul12,",
+    "mul(1,",
+    "mul(1,2]",
+    "mul[3,7]",
+    "do(]",
+    "don't(x",
+]
+MEMORY_SIZE: int = 2_000_000
+# Operands get up to this many digits, well past the three of the puzzle input
+MAX_OPERAND_DIGITS: int = 6
+
+
+def legacy_extract(memory: str) -> List[Tuple[str, int | None, int | None]]:
+    """
+    The previous implementation, kept to compare against.
+    """
+
+    def transform(match: re.Match) -> Tuple[str, int | None, int | None]:
+        if match.group(2) and match.group(3):
+            return "mul", int(match.group(2)), int(match.group(3))
+        elif "do()" in match.group(1):
+            return "do", None, None
+        elif "don't()" in match.group(1):
+            return "don't", None, None
+
+    return [transform(m) for m in re.finditer(LEGACY_PATTERN, memory)]
+
+
+def totals(instructions: List[Tuple[str, int | None, int | None]]) -> Tuple[int, int]:
+    """
+    Sums the products of all muls, and of the enabled ones, for both parts.
+    """
+    mul_enabled = True
+    total = 0
+    enabled_total = 0
+    for kind, x, y in instructions:
+        if kind == "mul":
+            total += x * y
+            enabled_total += x * y if mul_enabled else 0
+        else:
+            mul_enabled = kind == "do"
+    return total, enabled_total
+
+
+def generate_memory(size: int, seed: int = 2024) -> str:
+    """
+    Generates about `size` characters of near-miss tokens and a few real instructions.
+
+    Args:
+        size (int): Approximate length of the memory string.
+        seed (int): Seed for the random generator.
+
+    Returns:
+        str: The adversarial memory string.
+    """
+    rng = random.Random(seed)
+    parts: List[str] = []
+    length = 0
+    while length < size:
+        if rng.random() < 0.02:
+            x, y = (
+                rng.randint(1, 10 ** rng.randint(1, MAX_OPERAND_DIGITS) - 1)
+                for _ in range(2)
+            )
+            part = rng.choice([f"mul({x},{y})", "do()", "don't()"])
+        else:
+            part = rng.choice(NEAR_MISSES)
+        parts.append(part)
+        length += len(part)
+    return "".join(parts)
+
+
+if __name__ == "__main__":
+    memory = generate_memory(MEMORY_SIZE)
+    expected = legacy_extract(memory)
+    assert any(x > 999 for kind, x, _ in expected if kind == "mul")
+    assert extract_valid_state_mul_instructions(memory) == expected
+    assert scan_memory_stream(io.BytesIO(memory.encode()), 4096) == totals(expected)
+
+    legacy_seconds = time_call(lambda: legacy_extract(memory))
+    current_seconds = time_call(lambda: extract_valid_state_mul_instructions(memory))
+    print(f"Legacy pattern:      {MEMORY_SIZE / legacy_seconds:>14,.0f} chars/s")
+    print(f"Alternation pattern: {MEMORY_SIZE / current_seconds:>14,.0f} chars/s")
+    print(f"Speedup: {legacy_seconds / current_seconds:.1f}x")
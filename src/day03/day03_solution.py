@@ -1,8 +1,22 @@
+from concurrent.futures import ProcessPoolExecutor
+from dataclasses import dataclass, field
+from functools import reduce
+from itertools import repeat
 from pathlib import Path
-from typing import List, Tuple
+from typing import BinaryIO, Iterator, List, Optional, Tuple
+import mmap
+import os
 import re
 
-from shared.utils import extract_pattern, convert_str_tuple_to_int
+from shared.utils import (
+    compile_patterns,
+    compile_prefix_pattern,
+    convert_str_tuple_to_int,
+    extract_pattern,
+    extract_patterns,
+)
+
+MUL_PATTERN = r"mul\((\d+),(\d+)\)"
 
 
 def extract_valid_mul_instructions(memory: str) -> list[tuple[int, int]]:
@@ -10,8 +24,15 @@ def extract_valid_mul_instructions(memory: str) -> list[tuple[int, int]]:
     Extracts valid mul(X,Y) instructions from a memory string.
     Returns a list of tuples (X, Y) representing the operands.
     """
-    pattern = r"mul\((\d+),(\d+)\)"
-    return extract_pattern(memory, pattern, convert_str_tuple_to_int)
+    return extract_pattern(memory, MUL_PATTERN, convert_str_tuple_to_int)
+
+
+# Instruction kinds, all found in a single pass by `extract_patterns`
+STATE_MUL_PATTERNS = {
+    "mul": (MUL_PATTERN, convert_str_tuple_to_int),
+    "do": r"do\(\)",
+    "don't": r"don't\(\)",
+}
 
 
 def extract_valid_state_mul_instructions(
@@ -21,22 +42,303 @@ def extract_valid_state_mul_instructions(
     Extracts valid mul(X,Y) instructions and state-changing instructions (do(), don't()) from a memory string.
     Returns a list of tuples representing instructions and their types.
     """
-    # Updated regex: Matches mul(X,Y), do(), and don't() with surrounding jibberish
-    pattern = r"[^\s\(\)\[\]]*?(mul\((\d+),(\d+)\)|don\'t\(\)|do\(\))"
-
-    def transform(match: re.Match) -> Tuple[str, int | None, int | None]:
-        if match.group(2) and match.group(3):  # Matches `mul(X,Y)`
-            return "mul", int(match.group(2)), int(match.group(3))
-        elif "do()" in match.group(1):  # Matches `do()` exactly
-            return "do", None, None
-        elif "don't()" in match.group(1):  # Matches `don't()` exactly
-            return "don't", None, None
-
-    # Use `re.finditer` to iterate over matches and apply the transformation
-    # print(f"Debugging: Memory = {memory}")
-    parsed_instructions = [transform(m) for m in re.finditer(pattern, memory)]
-    # print(f"Debugging: Parsed Instructions = {parsed_instructions}")
-    return parsed_instructions
+    return [
+        ("mul", *operands) if kind == "mul" else (kind, None, None)
+        for kind, operands in extract_patterns(memory, STATE_MUL_PATTERNS)
+    ]
+
+
+# The same instructions compiled for raw bytes, so memory dumps can be scanned without
+# decoding. Chunk scanners need match offsets, so they look the instruction kind up
+# by the group that matched, and read a mul's operands from the groups after it.
+TOKEN_PATTERN, TOKEN_KINDS = compile_patterns(STATE_MUL_PATTERNS, binary=True)
+# Incomplete instruction left at the end of a chunk, still waiting for more bytes
+PARTIAL_TOKEN_PATTERN = compile_prefix_pattern(STATE_MUL_PATTERNS, binary=True)
+MUL_PREFIX = b"mul("
+OPERAND_DIGITS = re.compile(rb"\d*")
+CHUNK_SIZE = 1 << 20
+
+
+@dataclass
+class _PartialMul:
+    """
+    A mul(X,Y) instruction cut off by the end of a chunk, with its operands parsed so far.
+
+    Operand digits are folded into integers as they arrive, so a mul that spans many
+    chunks is never held, nor rescanned, as raw bytes.
+
+    Attributes:
+        operands (List[int]): The operands read so far; the last one may still grow.
+        digits (int): Number of digits read of the last operand.
+    """
+
+    operands: List[int] = field(default_factory=lambda: [0])
+    digits: int = 0
+
+    def feed(self, buffer: bytes, position: int) -> Tuple[int, Optional[bool]]:
+        """
+        Continues parsing the instruction at `position` of `buffer`.
+
+        Args:
+            buffer (bytes): The bytes following what was parsed so far.
+            position (int): Offset to continue at.
+
+        Returns:
+            Tuple[int, Optional[bool]]: The offset just past the consumed bytes, and
+                whether the instruction completed: True once its `)` is read, False
+                if it turned out invalid, or None if `buffer` ran out first.
+        """
+        while True:
+            run_end = OPERAND_DIGITS.match(buffer, position).end()
+            if run_end > position:
+                run_length = run_end - position
+                run_value = int(buffer[position:run_end])
+                self.operands[-1] = self.operands[-1] * 10**run_length + run_value
+                self.digits += run_length
+                position = run_end
+            if position == len(buffer):
+                return position, None
+
+            separator = b"," if len(self.operands) == 1 else b")"
+            if not self.digits or buffer[position] != separator[0]:
+                return position, False
+            position += 1
+            if len(self.operands) == 2:
+                return position, True
+            self.operands.append(0)
+            self.digits = 0
+
+    @property
+    def product(self) -> int:
+        """The product of the completed instruction."""
+        return self.operands[0] * self.operands[1]
+
+
+def _partial_token_start(buffer: bytes, start: int) -> int:
+    """
+    Finds where an incomplete instruction begins at the end of `buffer`, if any.
+
+    Instructions start with `m` or `d` and neither letter occurs inside another
+    instruction, so only the last `m` or `d` can start an incomplete one.
+
+    Args:
+        buffer (bytes): The scanned bytes.
+        start (int): Offset before which nothing needs to be kept.
+
+    Returns:
+        int: The offset to carry over into the next chunk, or `len(buffer)` if none.
+    """
+    candidate = max(buffer.rfind(b"m", start), buffer.rfind(b"d", start))
+    if candidate != -1 and PARTIAL_TOKEN_PATTERN.fullmatch(buffer, candidate):
+        return candidate
+    return len(buffer)
+
+
+def scan_memory_stream(
+    stream: BinaryIO, chunk_size: int = CHUNK_SIZE
+) -> Tuple[int, int]:
+    """
+    Scans a memory dump in fixed-size byte chunks and solves both parts in one pass.
+
+    Only the current chunk is ever held in memory. An unfinished `do()` or `don't()` is
+    carried into the next chunk as its few raw bytes, and an unfinished mul as its
+    operands parsed so far, so the carry stays small however long the operands get.
+    The `do()`/`don't()` state is carried across chunks too.
+
+    Args:
+        stream (BinaryIO): A binary stream over the memory dump.
+        chunk_size (int): Number of bytes read at a time.
+
+    Returns:
+        Tuple[int, int]: The solutions to part 1 and part 2.
+    """
+    mul_enabled = True
+    total = 0
+    enabled_total = 0
+    carry = b""
+    pending: Optional[_PartialMul] = None
+
+    while chunk := stream.read(chunk_size):
+        buffer = carry + chunk
+        scanned = 0
+        if pending is not None:
+            scanned, complete = pending.feed(buffer, 0)
+            if complete is None:
+                continue
+            if complete:
+                total += pending.product
+                if mul_enabled:
+                    enabled_total += pending.product
+            pending = None
+
+        for match in TOKEN_PATTERN.finditer(buffer, scanned):
+            group = match.lastindex
+            kind = TOKEN_KINDS[group]
+            if kind == "mul":
+                product = int(match[group + 1]) * int(match[group + 2])
+                total += product
+                if mul_enabled:
+                    enabled_total += product
+            else:
+                mul_enabled = kind == "do"
+            scanned = match.end()
+
+        partial = _partial_token_start(buffer, scanned)
+        carry = buffer[partial:]
+        if carry.startswith(MUL_PREFIX):
+            pending = _PartialMul()
+            pending.feed(buffer, partial + len(MUL_PREFIX))
+            carry = b""
+
+    return total, enabled_total
+
+
+def scan_memory_file(
+    file_path: str | Path, chunk_size: int = CHUNK_SIZE
+) -> Tuple[int, int]:
+    """
+    Solves both parts for a memory dump file of any size, see `scan_memory_stream`.
+    """
+    with open(file_path, "rb") as file:
+        return scan_memory_stream(file, chunk_size)
+
+
+@dataclass(frozen=True)
+class ChunkSummary:
+    """
+    Summarizes the instructions of one chunk of memory, whatever state it is entered in.
+
+    Summaries compose associatively with `then`, so chunks can be summarized
+    independently and combined in order afterwards.
+
+    Attributes:
+        total (int): Sum of every mul product in the chunk, for part 1.
+        if_enabled (int): Sum of the executed products if the chunk starts enabled.
+        if_disabled (int): Sum of the executed products if the chunk starts disabled.
+        exit_state (Optional[bool]): State set by the last do()/don't() in the chunk,
+            or None if the chunk has neither and passes its entry state through.
+    """
+
+    total: int = 0
+    if_enabled: int = 0
+    if_disabled: int = 0
+    exit_state: Optional[bool] = None
+
+    def _exit(self, entry_state: bool) -> bool:
+        """Returns the state after this chunk when it is entered in `entry_state`."""
+        return entry_state if self.exit_state is None else self.exit_state
+
+    def _sum(self, entry_state: bool) -> int:
+        """Returns the executed products when the chunk is entered in `entry_state`."""
+        return self.if_enabled if entry_state else self.if_disabled
+
+    def then(self, other: "ChunkSummary") -> "ChunkSummary":
+        """
+        Combines this summary with the one of the chunk that directly follows it.
+
+        Args:
+            other (ChunkSummary): The summary of the next chunk.
+
+        Returns:
+            ChunkSummary: The summary of both chunks back to back.
+        """
+        return ChunkSummary(
+            total=self.total + other.total,
+            if_enabled=self.if_enabled + other._sum(self._exit(True)),
+            if_disabled=self.if_disabled + other._sum(self._exit(False)),
+            exit_state=(
+                self.exit_state if other.exit_state is None else other.exit_state
+            ),
+        )
+
+
+def _chunk_matches(memory: mmap.mmap, start: int, end: int) -> Iterator[re.Match]:
+    """
+    Yields the instructions that start within bytes [start, end) of `memory`, in order.
+
+    Since no instruction contains an `m` or `d` after its first byte, instructions
+    found from `start` onwards are exactly those a full scan would find, and one that
+    runs past `end` can only start at the last `m` or `d` before it. Only that one is
+    matched beyond `end`, so a chunk never scans ahead into the rest of the file.
+    """
+    yield from TOKEN_PATTERN.finditer(memory, start, end)
+    last = max(memory.rfind(b"m", start, end), memory.rfind(b"d", start, end))
+    if last != -1:
+        match = TOKEN_PATTERN.match(memory, last)
+        if match and match.end() > end:
+            yield match
+
+
+def summarize_memory_chunk(file_path: str | Path, start: int, end: int) -> ChunkSummary:
+    """
+    Summarizes the instructions that start within bytes [start, end) of a memory dump.
+
+    The file is memory-mapped rather than passed in, so a worker process never has the
+    chunk pickled to it. See `_chunk_matches` for how the chunk edges are handled.
+
+    Args:
+        file_path (str | Path): Path to the memory dump.
+        start (int): First byte offset of the chunk.
+        end (int): Byte offset just past the chunk.
+
+    Returns:
+        ChunkSummary: The summary of the chunk.
+    """
+    total = 0
+    if_enabled = 0
+    if_disabled = 0
+    state: Optional[bool] = None
+
+    with open(file_path, "rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+            for match in _chunk_matches(memory, start, end):
+                group = match.lastindex
+                kind = TOKEN_KINDS[group]
+                if kind != "mul":
+                    state = kind == "do"
+                    continue
+
+                product = int(match[group + 1]) * int(match[group + 2])
+                total += product
+                if state is None:
+                    if_enabled += product
+                elif state:
+                    if_enabled += product
+                    if_disabled += product
+
+    return ChunkSummary(total, if_enabled, if_disabled, state)
+
+
+def part2_parallel(
+    file_path: str | Path,
+    workers: Optional[int] = None,
+    chunks_per_worker: int = 4,
+) -> int:
+    """
+    Solves part 2 for a memory dump by summarizing chunks of it in a process pool.
+
+    Args:
+        file_path (str | Path): Path to the memory dump.
+        workers (Optional[int]): Number of worker processes. Defaults to the CPU count.
+        chunks_per_worker (int): Chunks handed to each worker, to even out the load.
+
+    Returns:
+        int: The solution to part 2.
+    """
+    size = os.path.getsize(file_path)
+    if size == 0:
+        return 0
+
+    workers = workers or os.cpu_count() or 1
+    chunk_count = min(size, workers * chunks_per_worker)
+    bounds = [size * i // chunk_count for i in range(chunk_count + 1)]
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        summaries = executor.map(
+            summarize_memory_chunk, repeat(file_path), bounds[:-1], bounds[1:]
+        )
+        # Memory starts enabled, so the combined summary's enabled sum is the answer
+        return reduce(ChunkSummary.then, summaries, ChunkSummary()).if_enabled
 
 
 def part1(data: List[str]) -> int:
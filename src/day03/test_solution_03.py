@@ -1,7 +1,31 @@
+import io
+import mmap
 import pytest
+from pathlib import Path
 from typing import List
-from shared.utils import extract_pattern, convert_str_tuple_to_int
-from .day03_solution import extract_valid_mul_instructions, part1, part2
+from shared.utils import (
+    compile_patterns,
+    compile_prefix_pattern,
+    convert_str_tuple_to_int,
+    extract_pattern,
+    extract_patterns,
+)
+from .day03_solution import (
+    PARTIAL_TOKEN_PATTERN,
+    STATE_MUL_PATTERNS,
+    TOKEN_PATTERN,
+    extract_valid_mul_instructions,
+    extract_valid_state_mul_instructions,
+    part1,
+    part2,
+    scan_memory_stream,
+    scan_memory_file,
+    ChunkSummary,
+    summarize_memory_chunk,
+    part2_parallel,
+)
+
+INPUT_FILE = Path(__file__).parent / "input.txt"
 
 
 @pytest.fixture
@@ -31,6 +55,81 @@ def test_extract_pattern() -> None:
     assert extract_pattern(text, pattern, convert_str_tuple_to_int) == expected
 
 
+def test_extract_patterns(tmp_path: Path) -> None:
+    """
+    Test the multi-pattern extract_patterns utility over str, bytes and mmap inputs.
+    """
+    patterns = {
+        "mul": (r"mul\((\d+),(\d+)\)", convert_str_tuple_to_int),
+        "do": r"do\(\)",
+        "word": r"[a-z]+",
+    }
+    text = "mul(2,4)do()invalid(6,7)"
+    expected = [("mul", (2, 4)), ("do", "do()"), ("word", "invalid")]
+    assert list(extract_patterns(text, patterns)) == expected
+
+    expected_bytes = [("mul", (2, 4)), ("do", b"do()"), ("word", b"invalid")]
+    assert list(extract_patterns(text.encode(), patterns)) == expected_bytes
+
+    memory_file = tmp_path / "memory.txt"
+    memory_file.write_text(text)
+    with memory_file.open("rb") as file:
+        with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as memory:
+            assert list(extract_patterns(memory, patterns)) == expected_bytes
+
+
+def test_compile_patterns() -> None:
+    """
+    Test that compile_patterns names the group wrapping each pattern.
+    """
+    patterns = {"mul": (r"mul\((\d+),(\d+)\)", convert_str_tuple_to_int), "do": "do"}
+    scanner, kinds = compile_patterns(patterns, binary=True)
+    matches = [
+        (kinds[match.lastindex], match.start(), match.lastindex)
+        for match in scanner.finditer(b"xdo mul(3,4)")
+    ]
+    assert matches == [("do", 1, 4), ("mul", 4, 1)]
+    # A pattern's own groups directly follow the group wrapping it
+    assert scanner.search(b"mul(3,4)").group(2, 3) == (b"3", b"4")
+
+
+def test_compile_prefix_pattern() -> None:
+    """
+    Test that compile_prefix_pattern matches exactly the prefixes of each token.
+    """
+    prefixes = compile_prefix_pattern({"sum": r"\+(\d+)x", "pair": "ab"})
+    assert all(prefixes.fullmatch(text) for text in ["+", "+12", "+12x", "a", "ab"])
+    assert not any(prefixes.fullmatch(text) for text in ["", "x", "+x", "b", "abc"])
+    with pytest.raises(ValueError):
+        compile_prefix_pattern({"either": "a|b"})
+
+
+@pytest.mark.parametrize(
+    "token", [b"mul(1,2)", b"mul(1234,56789)", b"do()", b"don't()"]
+)
+def test_partial_token_pattern_tracks_tokens(token: bytes) -> None:
+    """
+    Test that every prefix of a complete instruction is a partial instruction.
+    """
+    assert PARTIAL_TOKEN_PATTERN.pattern == (
+        compile_prefix_pattern(STATE_MUL_PATTERNS, binary=True).pattern
+    )
+    assert TOKEN_PATTERN.fullmatch(token)
+    for end in range(1, len(token) + 1):
+        assert PARTIAL_TOKEN_PATTERN.fullmatch(token[:end])
+    for near_miss in [b"mul(,", b"mul(1,2]", b"do(]", b"dont"]:
+        assert not PARTIAL_TOKEN_PATTERN.fullmatch(near_miss)
+
+
+def test_extract_patterns_is_lazy() -> None:
+    """
+    Test that extract_patterns yields matches one at a time.
+    """
+    tokens = extract_patterns("a1b2", {"letter": r"[a-z]", "digit": (r"\d", int)})
+    assert next(tokens) == ("letter", "a")
+    assert next(tokens) == ("digit", 1)
+
+
 def test_part1(example_data: List[str]) -> None:
     """
     Test part1 of the solution with example input.
@@ -47,8 +146,100 @@ def example_data2() -> List[str]:
     return ["xmul(2,4)&mul[3,7]!^don't()_mul(5,5)+mul(32,64](mul(11,8)undo()?mul(8,5))"]
 
 
+def test_extract_valid_state_mul_instructions(example_data2: List[str]) -> None:
+    """
+    Test extraction of mul, do and don't instructions, including near misses.
+    """
+    expected = [
+        ("mul", 2, 4),
+        ("don't", None, None),
+        ("mul", 5, 5),
+        ("mul", 11, 8),
+        ("do", None, None),
+        ("mul", 8, 5),
+    ]
+    assert extract_valid_state_mul_instructions(example_data2[0]) == expected
+    assert extract_valid_state_mul_instructions("mul(1,2]do(]don'tmul(3,4)") == [
+        ("mul", 3, 4)
+    ]
+
+
 def test_part2(example_data2: List[str]) -> None:
     expected_result = 48  # 2*4 + 8*5
     result = part2(example_data2)
     print(f"Debugging: Part 2 result = {result}")
     assert result == expected_result
+
+
+@pytest.mark.parametrize("chunk_size", [1, 2, 3, 5, 8, 13, 64, 1 << 20])
+def test_scan_memory_stream(example_data2: List[str], chunk_size: int) -> None:
+    """
+    Test that instructions split across chunk boundaries are still found.
+    """
+    memory = "\n".join(example_data2 * 3).encode()
+    expected = (part1(example_data2 * 3), part2(example_data2 * 3))
+    assert scan_memory_stream(io.BytesIO(memory), chunk_size) == expected
+
+
+@pytest.mark.parametrize("chunk_size", [1, 5, 64])
+def test_scan_memory_stream_long_runs(chunk_size: int) -> None:
+    """
+    Test that operands spanning many chunks, and runs of unfinished prefixes, parse.
+    """
+    operand = "1" * 1000
+    data = [f"mul({operand},2)mul(2,3)" + "mul(" * 500 + "mul(4,5)mul(7" + "0" * 300]
+    expected = int(operand) * 2 + 6 + 20
+    assert part1(data) == part2(data) == expected
+    memory = data[0].encode()
+    assert scan_memory_stream(io.BytesIO(memory), chunk_size) == (expected, expected)
+
+
+def test_operands_of_any_length() -> None:
+    """
+    Test that operands are not limited to three digits.
+    """
+    data = ["mul(1234,5)mul(2,3)"]
+    assert part1(data) == part2(data) == 6176
+    assert scan_memory_stream(io.BytesIO(data[0].encode()), 3) == (6176, 6176)
+    # A mul cut off inside its operands resumes scanning where it turned invalid
+    data = ["mul(12,34mul(5,6)mul(7,]do()mul(8,9)"]
+    assert part1(data) == 102
+    assert scan_memory_stream(io.BytesIO(data[0].encode()), 2) == (102, 102)
+
+
+@pytest.mark.parametrize("chunk_size", [7, 4096])
+def test_scan_memory_file(chunk_size: int) -> None:
+    """
+    Test the streaming scanner against both parts on the full puzzle input.
+    """
+    with INPUT_FILE.open("r") as file:
+        data = file.read().splitlines()
+    assert scan_memory_file(INPUT_FILE, chunk_size) == (part1(data), part2(data))
+
+
+def test_chunk_summaries_compose(tmp_path: Path, example_data2: List[str]) -> None:
+    """
+    Test that summaries of consecutive chunks combine into the whole-file summary.
+    """
+    memory_file = tmp_path / "memory.txt"
+    memory_file.write_text("\n".join(example_data2 * 2) + "mul(123456,789)")
+    size = memory_file.stat().st_size
+
+    whole = summarize_memory_chunk(memory_file, 0, size)
+    for split in range(size + 1):
+        left = summarize_memory_chunk(memory_file, 0, split)
+        right = summarize_memory_chunk(memory_file, split, size)
+        assert left.then(right) == whole
+    assert ChunkSummary().then(whole) == whole == whole.then(ChunkSummary())
+    assert whole.if_enabled == part2(example_data2 * 2 + ["mul(123456,789)"])
+
+
+@pytest.mark.parametrize("chunks_per_worker", [1, 25])
+def test_part2_parallel(chunks_per_worker: int) -> None:
+    """
+    Test the process-pool mode against part2 on the full puzzle input.
+    """
+    with INPUT_FILE.open("r") as file:
+        data = file.read().splitlines()
+    result = part2_parallel(INPUT_FILE, workers=2, chunks_per_worker=chunks_per_worker)
+    assert result == part2(data)
@@ -0,0 +1,232 @@
+import os
+import resource
+import subprocess
+import sys
+import tempfile
+from pathlib import Path
+from typing import List
+import numpy as np
+from shared.data_classes import ByteGrid, Grid
+from shared.utils import time_call
+from day04.day04_solution import (
+    DIRECTIONS,
+    XMAS_STENCIL,
+    find_word,
+    find_xmas,
+    parse_grid,
+    part1_bitboard,
+    part2_bitboard,
+)
+
+GRID_SIZES: List[int] = [1_000, 4_000, 10_000]
+# The per-cell Python loop is only timed up to this size, beyond it takes minutes
+LEGACY_MAX_SIZE: int = 1_000
+WORD: str = "XMAS"
+DICTIONARY_SIZE: int = 200
+DICTIONARY_GRID_SIZE: int = 300
+MAPPED_GRID_SIZE: int = 20_000
+PARALLEL_GRID_SIZE: int = 10_000
+WORKER_COUNTS: List[int] = [1, 2, 4, 8, 16]
+INDEXED_GRID_SIZE: int = 4_000
+# Share of letter cells in the sparse grid, the rest being "."
+SPARSE_DENSITY: float = 0.04
+
+
+def generate_grid(size: int, seed: int = 2024, density: float = 1.0) -> Grid:
+    """
+    Generates a random size x size grid over the letters of XMAS.
+
+    Args:
+        size (int): Number of rows and columns.
+        seed (int): Seed for the random generator.
+        density (float): Share of cells holding a letter, the others holding ".".
+
+    Returns:
+        Grid: The generated grid.
+    """
+    rng = np.random.default_rng(seed)
+    letters = np.frombuffer(b"XMAS", dtype=np.uint8)
+    cells = rng.choice(letters, size=(size, size))
+    cells[rng.random((size, size)) >= density] = ord(".")
+    return Grid(data=[list(row.tobytes().decode()) for row in cells])
+
+
+def legacy_find_word(grid: Grid, word: str) -> int:
+    """
+    The previous per-cell search, kept to compare against.
+    """
+    starting_positions = [
+        (x, y)
+        for y, row in enumerate(grid.data)
+        for x, char in enumerate(row)
+        if char == word[0]
+    ]
+    count = 0
+    for x, y in starting_positions:
+        for direction in DIRECTIONS.values():
+            if grid.check_direction(x, y, direction.col, direction.row, word):
+                count += 1
+    return count
+
+
+def legacy_find_xmas(grid: Grid) -> int:
+    """
+    The previous per-cell X-MAS search, kept to compare against.
+    """
+    patterns = [
+        [("S", -1, -1), ("S", 1, -1), ("M", -1, 1), ("M", 1, 1)],
+        [("M", -1, -1), ("M", 1, -1), ("S", -1, 1), ("S", 1, 1)],
+        [("M", -1, -1), ("S", 1, -1), ("M", -1, 1), ("S", 1, 1)],
+        [("S", -1, -1), ("M", 1, -1), ("S", -1, 1), ("M", 1, 1)],
+    ]
+    grid_data = grid.data
+    return sum(
+        any(
+            all(grid_data[y + dy][x + dx] == char for char, dx, dy in pattern)
+            for pattern in patterns
+        )
+        for y in range(1, grid.rows - 1)
+        for x in range(1, grid.cols - 1)
+        if grid_data[y][x] == "A"
+    )
+
+
+def generate_words(count: int, seed: int = 2024) -> List[str]:
+    """
+    Generates `count` random words of 3 to 6 letters over the letters of XMAS.
+    """
+    rng = np.random.default_rng(seed)
+    return [
+        "".join(rng.choice(list("XMAS"), size=rng.integers(3, 7))) for _ in range(count)
+    ]
+
+
+def write_grid_file(file_path: Path, size: int, seed: int = 2024) -> None:
+    """
+    Writes a random size x size grid file one block of rows at a time.
+    """
+    rng = np.random.default_rng(seed)
+    letters = np.frombuffer(b"XMAS", dtype=np.uint8)
+    with file_path.open("wb") as file:
+        for start in range(0, size, 1_000):
+            block = rng.choice(letters, size=(min(1_000, size - start), size + 1))
+            block[:, -1] = ord("\n")
+            file.write(block.tobytes())
+
+
+def time_import(module: str) -> float:
+    """
+    Returns the seconds a fresh interpreter takes to import `module`.
+    """
+    code = f"import time; start = time.perf_counter(); import {module}; "
+    code += "print(time.perf_counter() - start)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return float(output.stdout)
+
+
+if __name__ == "__main__":
+    for size in GRID_SIZES:
+        grid = generate_grid(size)
+        cells = size * size
+        searches = [
+            ("word, vectorized", lambda: find_word(grid, WORD)),
+            # The first call builds the line strings, the second reuses the cache
+            ("word, line build", lambda: grid.count_word(WORD)),
+            ("word, line cached", lambda: grid.count_word(WORD)),
+            ("X-MAS, stencil", lambda: find_xmas(grid)),
+        ]
+        if size <= LEGACY_MAX_SIZE:
+            searches += [
+                ("word, per-cell", lambda: legacy_find_word(grid, WORD)),
+                ("X-MAS, per-cell", lambda: legacy_find_xmas(grid)),
+            ]
+        for name, search in searches:
+            rate = cells / time_call(search)
+            print(f"{size:>6} x {size:<6} | {name:<17}: {rate:>14,.0f} cells/s")
+
+    # A whole dictionary: one Aho-Corasick traversal against one search per word
+    grid = generate_grid(DICTIONARY_GRID_SIZE)
+    words = generate_words(DICTIONARY_SIZE)
+    for name, search in [
+        ("Aho-Corasick traversal", lambda: grid.find_words(words)),
+        ("vectorized per word", lambda: [grid.word_positions(w) for w in words]),
+        ("per-cell per word", lambda: [legacy_find_word(grid, w) for w in words]),
+    ]:
+        print(f"{DICTIONARY_SIZE} words | {name:<22}: {time_call(search):.2f}s")
+
+    # Storage: nested lists of str against one flat byte buffer
+    grid = generate_grid(DICTIONARY_GRID_SIZE)
+    compact = ByteGrid.from_grid(grid)
+    cells = grid.rows * grid.cols
+    list_bytes = sys.getsizeof(grid.data) + sum(map(sys.getsizeof, grid.data))
+    print(f"Grid:     {list_bytes / cells:.2f} bytes/cell")
+    print(f"ByteGrid: {compact.buffer.nbytes / cells:.2f} bytes/cell")
+    for name, store in [("Grid", grid), ("ByteGrid", compact)]:
+        seconds = time_call(
+            lambda: [
+                store.get(x, y) for y in range(store.rows) for x in range(store.cols)
+            ]
+        )
+        print(f"{name:<8} get(): {cells / seconds:>14,.0f} cells/s")
+
+    # A memory-mapped grid file: the search pages the file in without copying it
+    with tempfile.TemporaryDirectory() as temp_dir:
+        input_file = Path(temp_dir) / "grid.txt"
+        write_grid_file(input_file, MAPPED_GRID_SIZE)
+        with ByteGrid.from_file(input_file) as mapped:
+            cells = mapped.rows * mapped.cols
+            rate = cells / time_call(lambda: find_word(mapped, WORD))
+        print(f"Mapped {MAPPED_GRID_SIZE:,} rows | word: {rate:>14,.0f} cells/s")
+        # Mapped pages count as resident but are file-backed, so they can be dropped
+        peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss // 1024
+        print(f"Peak resident memory: {peak:,} MB for a {cells // 2**20:,} MB file")
+
+    # Horizontal bands scanned by worker processes over the grid in shared memory
+    grid = generate_grid(PARALLEL_GRID_SIZE)
+    cells = grid.rows * grid.cols
+    for workers in WORKER_COUNTS:
+        if workers > (os.cpu_count() or 1):
+            break
+        for name, search in [
+            ("word", lambda: find_word(grid, WORD, workers)),
+            ("X-MAS", lambda: find_xmas(grid, workers)),
+        ]:
+            rate = cells / time_call(search)
+            print(f"{workers:>2} workers | {name:<5}: {rate:>14,.0f} cells/s")
+
+    # Big-int bitboards against the NumPy path, both parsing the input lines
+    for module in ["shared.bitboard", "shared.data_classes"]:
+        print(f"import {module:<19}: {time_import(module) * 1000:.0f} ms")
+    for size in GRID_SIZES:
+        lines = ["".join(row) for row in generate_grid(size).data]
+        cells = size * size
+        for name, solve in [
+            ("word, NumPy", lambda: find_word(parse_grid(lines), WORD)),
+            ("word, bitboard", lambda: part1_bitboard(lines)),
+            ("X-MAS, NumPy", lambda: find_xmas(parse_grid(lines))),
+            ("X-MAS, bitboard", lambda: part2_bitboard(lines)),
+        ]:
+            rate = cells / time_call(solve)
+            print(f"{size:>6} x {size:<6} | {name:<15}: {rate:>14,.0f} cells/s")
+
+    # Repeated queries: the character index is built once, then only candidates are read
+    for density in [1.0, SPARSE_DENSITY]:
+        grid = generate_grid(INDEXED_GRID_SIZE, density=density)
+        build_seconds = time_call(lambda: grid.char_positions(WORD[0]))
+        print(f"density {density:.2f} | index build       : {build_seconds:.3f}s")
+        for name, search in [
+            ("word, full scan", lambda: grid.word_counts(WORD)),
+            ("word, indexed", lambda: grid.indexed_word_counts(WORD)),
+            ("X-MAS, full scan", lambda: grid.match_stencil(XMAS_STENCIL, rotate=True)),
+            (
+                "X-MAS, indexed",
+                lambda: grid.indexed_match_stencil(XMAS_STENCIL, rotate=True),
+            ),
+        ]:
+            print(f"density {density:.2f} | {name:<18}: {time_call(search):.3f}s")
+        seconds = time_call(lambda: grid.count_in_rectangle("X", 10, 10, 2_000, 3_000))
+        print(f"density {density:.2f} | first rectangle count: {seconds:.3f}s")
+        seconds = time_call(lambda: grid.count_in_rectangle("X", 0, 0, 500, 500))
+        print(f"density {density:.2f} | next rectangle count : {seconds * 1e6:.1f}us")
@@ -1,8 +1,44 @@
 import pytest
+import random
+import subprocess
+import sys
 from pathlib import Path
-from typing import List
-from .day04_solution import part1, part2, parse_grid, find_word, find_xmas
-from shared.data_classes import Grid
+from typing import Callable, List
+from .day04_solution import (
+    part1,
+    part2,
+    part1_bitboard,
+    part2_bitboard,
+    parse_grid,
+    find_word,
+    find_xmas,
+    DIRECTIONS,
+    XMAS_STENCIL,
+)
+import numpy as np
+from shared.bitboard import Bitboard
+from shared import data_classes
+from shared.data_classes import AhoCorasick, ByteGrid, Grid, stencil_variants
+
+
+def random_grid(rows: int, cols: int, alphabet: str = "XMAS", seed: int = 0) -> Grid:
+    """
+    Build a random character grid for comparing search strategies.
+    """
+    rng = random.Random(seed)
+    return Grid(data=[[rng.choice(alphabet) for _ in range(cols)] for _ in range(rows)])
+
+
+def brute_force_positions(grid: Grid, word: str, dx: int, dy: int) -> List[tuple]:
+    """
+    Reference search that probes every cell with Grid.check_direction.
+    """
+    return [
+        (x, y)
+        for y in range(grid.rows)
+        for x in range(grid.cols)
+        if grid.check_direction(x, y, dx, dy, word)
+    ]
 
 
 def test_parse_grid() -> None:
@@ -104,3 +140,431 @@ def test_part2_example() -> None:
     # Validate the result for part2
     expected_result: int = 9
     assert part2(input_data) == expected_result
+
+
+@pytest.mark.parametrize("word", ["XMAS", "SAMX", "A", "MAM", "XMASXMASXMASXMAS"])
+def test_word_search_matches_check_direction(word: str) -> None:
+    """
+    Test the vectorized Grid word search against probing every cell.
+    """
+    grid = random_grid(23, 17, seed=len(word))
+    counts = grid.word_counts(word)
+    positions = grid.word_positions(word)
+    for direction in DIRECTIONS.values():
+        dx, dy = direction.col, direction.row
+        expected = brute_force_positions(grid, word, dx, dy)
+        assert counts[(dx, dy)] == len(expected)
+        assert [tuple(cell) for cell in positions[(dx, dy)].tolist()] == expected
+
+
+def test_word_search_cache_follows_set() -> None:
+    """
+    Test that Grid.set invalidates the cached character array.
+    """
+    grid = parse_grid(["XMAS", "...."])
+    assert grid.word_counts("XMAS", [(1, 0)]) == {(1, 0): 1}
+    grid.set(0, 0, ".")
+    assert grid.word_counts("XMAS", [(1, 0)]) == {(1, 0): 0}
+
+
+@pytest.mark.parametrize("word", ["XMAS", "A", "MAM", "XMXM", "XMASXMASXMASXMAS"])
+def test_count_word_matches_word_counts(word: str) -> None:
+    """
+    Test counting over the cached line strings against the vectorized search.
+    """
+    grid = random_grid(19, 26, alphabet="XMA", seed=len(word))
+    assert grid.count_word(word) == sum(grid.word_counts(word).values())
+
+
+def test_lines_map_back_to_cells() -> None:
+    """
+    Test that every cached line covers its grid cells and is rebuilt after Grid.set.
+    """
+    grid = random_grid(4, 6, seed=1)
+    lines = grid.lines()
+    assert grid.lines() is lines
+    assert len(lines) == 4 + 6 + 2 * (4 + 6 - 1)
+    for line in lines:
+        for index, char in enumerate(line.text):
+            assert grid.get(*line.position(index)) == char
+
+    grid.set(0, 0, "Z")
+    assert grid.lines() is not lines
+    assert grid.lines()[0].text[0] == "Z"
+
+
+def test_aho_corasick() -> None:
+    """
+    Test that overlapping and nested patterns are all reported.
+    """
+    automaton = AhoCorasick(["he", "she", "his", "hers"])
+    assert sorted(automaton.iter_matches("ushers")) == [(3, 0), (3, 1), (5, 3)]
+
+
+def test_find_words_matches_word_positions() -> None:
+    """
+    Test Grid.find_words against the per-word vectorized search.
+    """
+    grid = random_grid(19, 26, seed=7)
+    words = ["XMAS", "SAM", "MAM", "A", "XMASX", "QQ"]
+    found = grid.find_words(words)
+    assert set(found) == set(words)
+    for word in words:
+        expected = sorted(
+            (int(x), int(y), dx, dy)
+            for (dx, dy), cells in grid.word_positions(word).items()
+            for x, y in cells
+        )
+        assert sorted(found[word]) == expected
+
+
+def test_find_words_example() -> None:
+    """
+    Test Grid.find_words on the example input.
+    """
+    with (Path(__file__).parent / "test_input.txt").open("r") as file:
+        grid = parse_grid(file.read().splitlines())
+    found = grid.find_words(["XMAS", "MAS"])
+    assert len(found["XMAS"]) == 18
+    assert len(found["MAS"]) == find_word(grid, "MAS")
+
+
+def test_stencil_variants() -> None:
+    """
+    Test rotation and reflection of stencils, without duplicate orientations.
+    """
+    assert stencil_variants(["AB"], rotate=True) == [
+        ("AB",),
+        ("A", "B"),
+        ("BA",),
+        ("B", "A"),
+    ]
+    assert stencil_variants(["AB"], reflect=True) == [("AB",), ("BA",)]
+    assert len(stencil_variants(["M.S", ".A.", "M.S"], rotate=True, reflect=True)) == 4
+    assert stencil_variants(["A.A", ".A.", "A.A"], rotate=True) == [
+        ("A.A", ".A.", "A.A")
+    ]
+    with pytest.raises(ValueError):
+        stencil_variants(["AB", "C"])
+
+
+@pytest.mark.parametrize(
+    "stencil, rotate, reflect",
+    [
+        (["M.S", ".A.", "M.S"], True, False),
+        (["XM", "A."], True, True),
+        (["X.A"], False, True),
+        (["....", "MA.S"], True, False),
+    ],
+)
+def test_match_stencil_matches_brute_force(
+    stencil: List[str], rotate: bool, reflect: bool
+) -> None:
+    """
+    Test Grid.match_stencil against checking every placement cell by cell.
+    """
+    grid = random_grid(21, 18, seed=len(stencil))
+    expected = sum(
+        all(
+            char == "." or grid.get(x + dx, y + dy) == char
+            for dy, row in enumerate(variant)
+            for dx, char in enumerate(row)
+        )
+        for variant in stencil_variants(stencil, rotate, reflect)
+        for y in range(grid.rows - len(variant) + 1)
+        for x in range(grid.cols - len(variant[0]) + 1)
+    )
+    assert grid.match_stencil(stencil, rotate=rotate, reflect=reflect) == expected
+
+
+def test_byte_grid_matches_grid() -> None:
+    """
+    Test that ByteGrid behaves like Grid for access, updates and searches.
+    """
+    grid = random_grid(12, 9, seed=3)
+    compact = ByteGrid.from_grid(grid)
+    assert compact == ByteGrid.from_lines("".join(row) for row in grid.data)
+    assert compact.to_grid() == grid
+    assert compact.get_grid_dimensions() == grid.get_grid_dimensions() == (12, 9)
+
+    for y in range(grid.rows):
+        for x in range(grid.cols):
+            assert compact.get(x, y) == grid.get(x, y)
+            assert compact.get_flat(compact.flat_index(x, y)) == grid.get(x, y)
+            for dx, dy in grid.word_counts("XMAS"):
+                assert compact.check_direction(x, y, dx, dy, "XMAS") == (
+                    grid.check_direction(x, y, dx, dy, "XMAS")
+                )
+
+    assert compact.word_counts("XMAS") == grid.word_counts("XMAS")
+    assert compact.match_stencil(["M.S", ".A.", "M.S"], rotate=True) == find_xmas(grid)
+
+    compact.set(4, 2, "Z")
+    grid.set(4, 2, "Z")
+    assert compact.to_grid() == grid
+    with pytest.raises(IndexError):
+        compact.get(9, 0)
+    with pytest.raises(ValueError):
+        compact.set(0, 12, "X")
+
+
+def test_byte_grid_views_and_stride() -> None:
+    """
+    Test zero-copy row and column views over a buffer with a row stride.
+    """
+    buffer = bytearray(b"XMAS\nMAMX\nATXM")
+    compact = ByteGrid(buffer, rows=3, cols=4, stride=5)
+    assert compact.row(1).tobytes() == b"MAMX"
+    assert compact.column(3).tobytes() == b"SXM"
+    assert np.shares_memory(compact.column(3), compact.buffer)
+    assert compact.to_grid() == parse_grid(["XMAS", "MAMX", "ATXM"])
+
+    compact.set(0, 2, "S")
+    assert buffer[10:11] == b"S"
+    assert compact.row(2).tobytes() == b"STXM"
+    # Views are read-only, so no write can skip the cache invalidation of `set`
+    for view in [compact.row(0), compact.column(0), compact.to_array()]:
+        with pytest.raises(ValueError):
+            view[0] = ord("Z")
+    with pytest.raises(ValueError):
+        ByteGrid(buffer, rows=4, cols=4, stride=5)
+
+
+@pytest.mark.parametrize("rows", [["AB", "C", "DEF"], ["AB", "CDE", "F"]])
+def test_grids_reject_ragged_rows(rows: List[str]) -> None:
+    """
+    Test that a row of another length is rejected, even when the cell count matches.
+    """
+    with pytest.raises(ValueError, match="row 1"):
+        Grid([list(row) for row in rows]).to_array()
+    with pytest.raises(ValueError, match="row 1"):
+        ByteGrid.from_lines(rows)
+
+
+def test_byte_grid_is_compact() -> None:
+    """
+    Test that a ByteGrid uses a fraction of the memory of a list-of-lists Grid.
+    """
+    grid = random_grid(200, 200, seed=5)
+    list_bytes = sys.getsizeof(grid.data) + sum(map(sys.getsizeof, grid.data))
+    assert ByteGrid.from_grid(grid).buffer.nbytes * 8 < list_bytes
+
+
+@pytest.fixture
+def grid_file(tmp_path: Path) -> Callable[[bytes], Path]:
+    """
+    Fixture writing the given bytes to a grid file and returning its path.
+    """
+
+    def write(content: bytes) -> Path:
+        file_path = tmp_path / "grid.txt"
+        file_path.write_bytes(content)
+        return file_path
+
+    return write
+
+
+@pytest.mark.parametrize("newline", ["\n", "\r\n"])
+@pytest.mark.parametrize("trailing", [True, False])
+def test_byte_grid_from_file(
+    grid_file: Callable[[bytes], Path], newline: str, trailing: bool
+) -> None:
+    """
+    Test mapping a grid file, whatever its line endings and final newline.
+    """
+    lines = ["MMMSXXMASM", "MSAMXMSMSA", "AMXSXMAAMM"]
+    text = newline.join(lines) + (newline if trailing else "")
+
+    with ByteGrid.from_file(grid_file(text.encode())) as compact:
+        assert compact.get_grid_dimensions() == (3, 10)
+        assert compact == ByteGrid.from_lines(lines)
+        assert compact.row(2).tobytes() == b"AMXSXMAAMM"
+        assert find_word(compact, "XMAS") == find_word(parse_grid(lines), "XMAS")
+        with pytest.raises(TypeError):
+            compact.set(0, 0, "X")
+    # Closing releases the mapping and leaves an empty grid
+    assert compact.get_grid_dimensions() == (0, 0)
+
+
+def test_byte_grid_from_file_checks_in_blocks(
+    grid_file: Callable[[bytes], Path], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """
+    Test that a file far larger than a shape-check block is checked through.
+    """
+    monkeypatch.setattr(data_classes, "SHAPE_CHECK_BYTES", 16)
+    lines = ["".join(random.Random(y).choices("XMAS", k=37)) for y in range(200)]
+    with ByteGrid.from_file(grid_file("\n".join(lines).encode())) as compact:
+        assert compact == ByteGrid.from_lines(lines)
+    # A newline swapped into a row far past the first block, keeping every row end
+    lines[150] = lines[150][:10] + "\n" + lines[150][11:]
+    with pytest.raises(ValueError):
+        ByteGrid.from_file(grid_file("\n".join(lines).encode()))
+
+
+def test_byte_grid_from_file_copy_on_write(grid_file: Callable[[bytes], Path]) -> None:
+    """
+    Test that changes to a copy-on-write mapping never reach the file.
+    """
+    file_path = grid_file(b"XMAS\nSAMX\n")
+    compact = ByteGrid.from_file(file_path, copy_on_write=True)
+    compact.set(3, 1, "S")
+    assert compact.get(3, 1) == "S"
+    assert file_path.read_bytes() == b"XMAS\nSAMX\n"
+    compact.close()
+
+
+@pytest.mark.parametrize(
+    "content",
+    [b"XMAS\nSAM\n", b"AB\nCDE\nF\n", b"AB\n\nB\n", b"AB\r\nCDE\nF\r\n"],
+)
+def test_byte_grid_from_file_rejects_ragged_rows(
+    grid_file: Callable[[bytes], Path], content: bytes
+) -> None:
+    """
+    Test that ragged rows are rejected, even when the file size divides evenly.
+    """
+    with pytest.raises(ValueError):
+        ByteGrid.from_file(grid_file(content))
+
+
+def test_parallel_band_scan_matches_serial() -> None:
+    """
+    Test that banded scans in worker processes count matches across bands only once.
+    """
+    grid = random_grid(200, 30, seed=11)
+    compact = ByteGrid.from_grid(grid)
+    for target in (grid, compact):
+        assert find_word(target, "XMAS", workers=2) == find_word(target, "XMAS")
+        assert find_xmas(target, workers=2) == find_xmas(target)
+    assert grid.word_counts("XMAS", workers=3) == grid.word_counts("XMAS")
+
+
+def test_bitboard_examples() -> None:
+    """
+    Test the big-int bitboard solutions with the example in test_input.txt.
+    """
+    test_input_path: Path = Path(__file__).parent / "test_input.txt"
+    with test_input_path.open("r") as file:
+        input_data: List[str] = file.read().splitlines()
+
+    assert part1_bitboard(input_data) == 18
+    assert part2_bitboard(input_data) == 9
+
+
+def test_bitboard_entry_points_skip_numpy() -> None:
+    """
+    Test that the bitboard solutions import and run without NumPy or process pools.
+    """
+    heavy_modules = [
+        "numpy",
+        "mmap",
+        "concurrent.futures.process",
+        "multiprocessing.shared_memory",
+    ]
+    code = (
+        "import sys\n"
+        "from day04.day04_solution import part1_bitboard, part2_bitboard\n"
+        "part1_bitboard(['XMAS', 'MMSS']) + part2_bitboard(['MAS', 'AAA', 'MAS'])\n"
+        f"print([name for name in {heavy_modules!r} if name in sys.modules])\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=Path(__file__).parent.parent,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "[]"
+
+
+@pytest.mark.parametrize("word", ["XMAS", "SAMX", "A", "MAM", "XMASXMASXMASXMAS"])
+def test_bitboard_matches_check_direction(word: str) -> None:
+    """
+    Test the bitboard word masks against probing every cell, across the guard column.
+    """
+    grid = random_grid(13, 21, seed=len(word) + 3)
+    board = Bitboard.from_grid(grid)
+    for direction in DIRECTIONS.values():
+        dx, dy = direction.col, direction.row
+        mask = board.word_matches(word, dx, dy)
+        assert board.cells(mask) == brute_force_positions(grid, word, dx, dy)
+    with pytest.raises(ValueError):
+        board.word_matches(word, 2, 0)
+
+
+@pytest.mark.parametrize("stencil", [["M.S", ".A.", "M.S"], ["XM", ".A"], ["S...S"]])
+def test_bitboard_stencil_matches_grid(stencil: List[str]) -> None:
+    """
+    Test that the anchor mask keeps wide stencils from wrapping into the next row.
+    """
+    grid = random_grid(17, 9, seed=len(stencil))
+    board = Bitboard.from_grid(grid)
+    for rotate in (False, True):
+        assert board.match_stencil(stencil, rotate=rotate) == grid.match_stencil(
+            stencil, rotate=rotate
+        )
+
+
+@pytest.mark.parametrize("make_grid", [lambda grid: grid, ByteGrid.from_grid])
+def test_char_index_follows_set(make_grid) -> None:
+    """
+    Test the character index and prefix sums against a rebuild after every change.
+    """
+    target = make_grid(random_grid(12, 9, alphabet="XMAS.", seed=7))
+    rng = random.Random(7)
+    for _ in range(20):
+        a_count = target.char_positions("A").size
+        assert target.count_in_rectangle("A", 0, 0, 9, 12) == a_count
+        x, y = rng.randrange(9), rng.randrange(12)
+        target.set(x, y, rng.choice("XMAS."))
+        fresh = ByteGrid(bytearray(target.to_array().tobytes()), rows=12, cols=9)
+        for char in "XMAS.":
+            expected = fresh.char_positions(char).tolist()
+            assert target.char_positions(char).tolist() == expected
+    assert target.char_positions("Z").size == 0
+
+
+def test_char_index_follows_set_flat() -> None:
+    """
+    Test that buffer offsets of a strided grid update the index at the right cell.
+    """
+    compact = ByteGrid(bytearray(b"XMAS\nMAMX\nATXM"), rows=3, cols=4, stride=5)
+    assert compact.char_positions("S").tolist() == [3]
+    compact.set_flat(compact.flat_index(1, 2), "S")
+    assert compact.get(1, 2) == "S"
+    assert compact.char_positions("S").tolist() == [3, 2 * 4 + 1]
+    assert compact.char_positions("T").size == 0
+    for offset in [4, 9, -1, 15]:
+        with pytest.raises(ValueError):
+            compact.set_flat(offset, "S")
+    assert compact.char_positions("S").tolist() == [3, 9]
+
+
+def test_count_in_rectangle_matches_slices() -> None:
+    """
+    Test the prefix-sum rectangle counts against counting array slices.
+    """
+    grid = random_grid(15, 11, seed=3)
+    array = grid.to_array()
+    rng = random.Random(3)
+    for _ in range(50):
+        x0, x1 = sorted(rng.randrange(-2, 14) for _ in range(2))
+        y0, y1 = sorted(rng.randrange(-2, 18) for _ in range(2))
+        expected = np.count_nonzero(array[max(y0, 0) : y1, max(x0, 0) : x1] == ord("M"))
+        assert grid.count_in_rectangle("M", x0, y0, x1, y1) == expected
+    assert grid.count_in_rectangle("M", 5, 5, 5, 9) == 0
+
+
+@pytest.mark.parametrize("alphabet", ["XMAS", "XMAS" + "." * 20])
+def test_indexed_searches_match_vectorized(alphabet: str) -> None:
+    """
+    Test the searches from indexed candidate cells against the full-grid masks.
+    """
+    grid = random_grid(31, 24, alphabet=alphabet, seed=len(alphabet))
+    for word in ["XMAS", "A", "MAM"]:
+        assert grid.indexed_word_counts(word) == grid.word_counts(word)
+    assert grid.indexed_match_stencil(XMAS_STENCIL, rotate=True) == find_xmas(grid)
+    grid.set(3, 4, "A")
+    assert np.array_equal(grid.to_array(), Grid(grid.data).to_array())
+    assert grid.indexed_word_counts("XMAS") == grid.word_counts("XMAS")
@@ -0,0 +1,197 @@
+import random
+from collections import defaultdict, deque
+from typing import Dict, List, Tuple
+from shared.data_classes import TopologicalSorter
+from shared.utils import time_call
+from day05.day05_solution import (
+    build_rule_index,
+    RuleEngine,
+    filter_updates,
+    middle_page_with_index,
+    sort_update_with_index,
+    validate_updates,
+)
+
+NODE_COUNTS: List[int] = [100_000, 300_000, 1_000_000]
+# The deque re-sorting sort is only timed up to this size, beyond it takes minutes
+LEGACY_MAX_NODES: int = 100_000
+EDGES_PER_NODE: int = 3
+# Nodes per layer of the generated DAG, all of them ready at the same time
+LAYER_WIDTH: int = 25_000
+PAGE_COUNT: int = 150
+RULE_COUNT: int = 10_000
+UPDATE_COUNT: int = 100_000
+# Sorting by scanning every rule is only timed on this many updates
+LEGACY_UPDATES: int = 1_000
+RULE_CHANGES: int = 200
+
+
+def generate_edges(count: int, seed: int = 2024) -> List[Tuple[int, int]]:
+    """
+    Generates a wide random DAG: layers of nodes, each depending on a few nodes of
+    the layer before it.
+
+    Args:
+        count (int): Number of nodes.
+        seed (int): Seed for the random generator.
+
+    Returns:
+        List[Tuple[int, int]]: The (x, y) edges, with x before y.
+    """
+    rng = random.Random(seed)
+    labels = list(range(count))
+    rng.shuffle(labels)
+    edges = []
+    for rank in range(LAYER_WIDTH, count):
+        layer_start = rank - rank % LAYER_WIDTH
+        for _ in range(EDGES_PER_NODE):
+            source = rng.randrange(layer_start - LAYER_WIDTH, layer_start)
+            edges.append((labels[source], labels[rank]))
+    return edges
+
+
+def legacy_sort(edges: List[Tuple[int, int]], nodes: List[int]) -> List[int]:
+    """
+    The previous sort, re-sorting the whole queue whenever a node becomes ready.
+    """
+    graph: Dict[int, List[int]] = defaultdict(list)
+    in_degree: Dict[int, int] = defaultdict(int)
+    for x, y in edges:
+        graph[x].append(y)
+        in_degree[y] += 1
+    queue = deque(sorted(node for node in nodes if in_degree[node] == 0))
+    sorted_nodes = []
+    while queue:
+        node = queue.popleft()
+        sorted_nodes.append(node)
+        for neighbor in graph[node]:
+            in_degree[neighbor] -= 1
+            if in_degree[neighbor] == 0:
+                queue.append(neighbor)
+                queue = deque(sorted(queue))
+    return sorted_nodes
+
+
+def generate_rules_and_updates(
+    seed: int = 2024,
+) -> Tuple[List[Tuple[int, int]], List[List[int]]]:
+    """
+    Generates rules consistent with a hidden page order, and updates of 5 to 23 pages.
+
+    Args:
+        seed (int): Seed for the random generator.
+
+    Returns:
+        Tuple[List[Tuple[int, int]], List[List[int]]]: The rules and the updates.
+    """
+    rng = random.Random(seed)
+    order = rng.sample(range(10, 100 + PAGE_COUNT), PAGE_COUNT)
+    pairs = [(i, j) for i in range(PAGE_COUNT) for j in range(i + 1, PAGE_COUNT)]
+    rules = [(order[i], order[j]) for i, j in rng.sample(pairs, RULE_COUNT)]
+    updates = [rng.sample(order, rng.randrange(5, 24, 2)) for _ in range(UPDATE_COUNT)]
+    return rules, updates
+
+
+def legacy_is_update_valid(update: List[int], rules: List[Tuple[int, int]]) -> bool:
+    """
+    The previous validator, checking every rule against the update's positions.
+    """
+    position = {page: i for i, page in enumerate(update)}
+    return all(
+        position.get(x, -1) <= position.get(y, -1)
+        for x, y in rules
+        if x in position and y in position
+    )
+
+
+def legacy_sort_update(update: List[int], rules: List[Tuple[int, int]]) -> List[int]:
+    """
+    The previous sort, scanning every rule for each update.
+    """
+    sorter = TopologicalSorter()
+    for x, y in rules:
+        if x in update and y in update:
+            sorter.add_edge(x, y)
+    return sorter.sort(update)
+
+
+if __name__ == "__main__":
+    for count in NODE_COUNTS:
+        edges = generate_edges(count)
+        nodes = list(range(count))
+        sorter = TopologicalSorter()
+        for x, y in edges:
+            sorter.add_edge(x, y)
+
+        seconds = time_call(lambda: sorter.sort(nodes))
+        print(f"{count:>8,} nodes | heap sort:   {seconds:.2f}s")
+        # The sorter is left untouched, so it can be sorted again
+        seconds = time_call(lambda: sorter.sort(nodes))
+        print(f"{count:>8,} nodes | second sort: {seconds:.2f}s")
+        layers: List[List[int]] = []
+        seconds = time_call(lambda: layers.extend(sorter.layers(nodes)))
+        print(f"{count:>8,} nodes | layers:      {seconds:.2f}s ({len(layers)} layers)")
+        if count <= LEGACY_MAX_NODES:
+            assert legacy_sort(edges, nodes) == sorter.sort(nodes)
+            seconds = time_call(lambda: legacy_sort(edges, nodes))
+            print(f"{count:>8,} nodes | legacy sort: {seconds:.2f}s")
+
+    # Day 5 with one compiled rule index against scanning all rules per update
+    rules, updates = generate_rules_and_updates()
+    rule_index = build_rule_index(rules)
+    invalid = [updates[index] for index in filter_updates(updates, rule_index, False)]
+    seconds = time_call(lambda: build_rule_index(rules))
+    print(f"Rule index: {len(rules):,} rules compiled in {seconds * 1000:.1f} ms")
+    seconds = time_call(lambda: validate_updates(updates, rule_index))
+    print(f"Indexed validation:   {len(updates) / seconds:>10,.0f} updates/s")
+    sample = updates[:LEGACY_UPDATES]
+    seconds = time_call(lambda: [legacy_is_update_valid(u, rules) for u in sample])
+    print(f"Rule-scan validation: {len(sample) / seconds:>10,.0f} updates/s")
+    seconds = time_call(
+        lambda: [sort_update_with_index(update, rule_index) for update in invalid]
+    )
+    print(f"Indexed sort:         {len(invalid) / seconds:>10,.0f} updates/s")
+    sample = invalid[:LEGACY_UPDATES]
+    seconds = time_call(
+        lambda: [legacy_sort_update(update, rules) for update in sample]
+    )
+    print(f"Rule-scan sort:       {len(sample) / seconds:>10,.0f} updates/s")
+
+    # Middle page only: predecessor counts against sorting, with the generated rules
+    # (some pairs unordered, so some updates fall back to sorting) and with every pair
+    pages = sorted({page for rule in rules for page in rule})
+    complete_index = build_rule_index(
+        [(x, y) for i, x in enumerate(pages) for y in pages[i + 1 :]]
+    )
+    for label, index in [("generated", rule_index), ("complete", complete_index)]:
+        for name, select in [
+            ("sort", lambda u: sort_update_with_index(u, index)[len(u) // 2]),
+            ("counts", lambda u: middle_page_with_index(u, index)),
+        ]:
+            seconds = time_call(lambda: [select(update) for update in invalid])
+            print(
+                f"Middle page, {label:<9} rules, by {name:<6}: "
+                f"{len(invalid) / seconds:>10,.0f} updates/s"
+            )
+
+    # A few rules changing at a time: incremental engine against recomputing everything
+    engine = RuleEngine(rules, updates)
+    seconds = time_call(lambda: RuleEngine(rules, updates))
+    print(f"Rule engine built in {seconds:.2f}s")
+    changed = random.Random(7).sample(rules, RULE_CHANGES // 2)
+
+    def change_rules() -> None:
+        for x, y in changed:
+            engine.remove_rule(x, y)
+        for x, y in changed:
+            engine.add_rule(x, y)
+
+    seconds = time_call(change_rules)
+    print(f"Incremental:    {seconds / RULE_CHANGES * 1000:>8.2f} ms per rule change")
+    seconds = time_call(
+        lambda: sum(
+            middle_page_with_index(updates[index], rule_index)
+            for index in filter_updates(updates, rule_index, valid=False)
+        )
+    )
+    print(f"Full recompute: {seconds * 1000:>8.2f} ms per rule change")
@@ -1,7 +1,12 @@
+from dataclasses import InitVar, dataclass
 from pathlib import Path
-from typing import List, Tuple
+from typing import Dict, FrozenSet, Iterable, List, Set, Tuple
 from shared.data_classes import TopologicalSorter
 
+# For each page, the pages that rules say must come after it
+RuleIndex = Dict[int, Set[int]]
+NO_SUCCESSORS: FrozenSet[int] = frozenset()
+
 
 def parse_rules_and_updates(
     data: List[str],
@@ -21,6 +26,46 @@ def parse_rules_and_updates(
     return rules, updates
 
 
+def build_rule_index(rules: List[Tuple[int, int]]) -> RuleIndex:
+    """
+    Compiles the rules once into the set of successors of each page.
+
+    Args:
+        rules (List[Tuple[int, int]]): The ordering rules as pairs (x, y), where `x`
+            must appear before `y`.
+
+    Returns:
+        RuleIndex: For each page `x`, the set of every `y` with a rule (x, y).
+    """
+    rule_index: RuleIndex = {}
+    for x, y in rules:
+        rule_index.setdefault(x, set()).add(y)
+    return rule_index
+
+
+def is_update_valid_with_index(update: List[int], rule_index: RuleIndex) -> bool:
+    """
+    Checks if an update respects the ordering rules, using a compiled rule index.
+
+    A page breaks a rule exactly when one of its successors was already seen earlier in
+    the update, so a single pass with a set of seen pages checks every pair. The cost
+    depends on the update's length and not on the number of rules.
+
+    Args:
+        update (List[int]): The update to check, as pages in order.
+        rule_index (RuleIndex): The rules compiled by `build_rule_index`.
+
+    Returns:
+        bool: True if the `update` satisfies all the ordering rules, False otherwise.
+    """
+    seen: Set[int] = set()
+    for page in update:
+        if not rule_index.get(page, NO_SUCCESSORS).isdisjoint(seen):
+            return False
+        seen.add(page)
+    return True
+
+
 def is_update_valid(update: List[int], rules: List[Tuple[int, int]]) -> bool:
     """
     Checks if an update respects the ordering rules.
@@ -32,49 +77,50 @@ def is_update_valid(update: List[int], rules: List[Tuple[int, int]]) -> bool:
     Returns:
         bool: True if the `update` satisfies all the ordering rules, False otherwise.
     """
-    # Create a mapping of each page's position in the update
-    # Example: If update = [75, 47, 61, 53, 29], position = {75: 0, 47: 1, 61: 2, 53: 3, 29: 4}
-    position = {page: i for i, page in enumerate(update)}
-
-    # Validate that all rules are respected:
-    # - For each rule (x, y), check if x appears before or at the same position as y.
-    # - Ignore rules where either x or y is not in the update.
-    return all(
-        position.get(x, -1)
-        <= position.get(y, -1)  # Ensure x comes before or at the same position as y
-        for x, y in rules  # Iterate over all rules
-        if x in position
-        and y in position  # Only consider rules where both x and y are in the update
-    )
+    return is_update_valid_with_index(update, build_rule_index(rules))
+
+
+def validate_updates(updates: List[List[int]], rule_index: RuleIndex) -> List[bool]:
+    """
+    Checks a whole batch of updates against the same compiled rules.
+
+    Args:
+        updates (List[List[int]]): The updates to check.
+        rule_index (RuleIndex): The rules compiled by `build_rule_index`.
+
+    Returns:
+        List[bool]: Whether each update satisfies all the ordering rules.
+    """
+    return [is_update_valid_with_index(update, rule_index) for update in updates]
 
 
 def filter_updates(
-    updates: List[List[int]], rules: List[Tuple[int, int]], valid: bool = True
-) -> List[List[int]]:
+    updates: List[List[int]], rule_index: RuleIndex, valid: bool = True
+) -> List[int]:
     """
     Filters updates based on their validity according to the rules.
 
     Args:
         updates (List[List[int]]): The list of updates to filter.
-        rules (List[Tuple[int, int]]): The ordering rules.
+        rule_index (RuleIndex): The rules compiled by `build_rule_index`.
         valid (bool): If True, filters for valid updates. If False, filters for invalid updates.
 
     Returns:
-        List[List[int]]: The filtered list of updates.
+        List[int]: The indices of the matching updates, so no update is copied.
     """
-    # Use a list comprehension to filter updates:
-    # - Keeps updates if `is_update_valid(update, rules)` matches the `valid` flag.
-    # - If `valid` is True, only valid updates are kept.
-    # - If `valid` is False, only invalid updates are kept.
-    return [update for update in updates if is_update_valid(update, rules) == valid]
+    return [
+        index
+        for index, is_valid in enumerate(validate_updates(updates, rule_index))
+        if is_valid == valid
+    ]
 
 
-def middle_page_sum(valid_updates: List[List[int]]) -> int:
+def middle_page_sum(valid_updates: Iterable[List[int]]) -> int:
     """
     Calculates the sum of the middle pages of valid updates.
 
     Args:
-        valid_updates (List[List[int]]): List of valid updates.
+        valid_updates (Iterable[List[int]]): The valid updates.
 
     Returns:
         int: The sum of the middle pages.
@@ -82,6 +128,48 @@ def middle_page_sum(valid_updates: List[List[int]]) -> int:
     return sum(update[len(update) // 2] for update in valid_updates)
 
 
+def _update_successors(update: List[int], rule_index: RuleIndex) -> Dict[int, Set[int]]:
+    """
+    Get the successors of each page of an update among the update's pages.
+    """
+    pages = set(update)
+    return {page: rule_index.get(page, NO_SUCCESSORS) & pages for page in pages}
+
+
+def _sort_by_successors(
+    update: List[int], successors: Dict[int, Set[int]]
+) -> List[int]:
+    """
+    Sorts an update given the successors of each of its pages within it.
+    """
+    sorter = TopologicalSorter()
+
+    # The successor sets already are the graph, so they are copied in whole rather
+    # than one edge at a time
+    sorter.graph.update((x, list(after)) for x, after in successors.items() if after)
+
+    # Perform the topological sort
+    return sorter.sort(update)
+
+
+def sort_update_with_index(update: List[int], rule_index: RuleIndex) -> List[int]:
+    """
+    Sorts an update using a compiled rule index.
+
+    Only the rules between pages of the update are looked at: for each page, its
+    successors are intersected with the update's pages, so the cost depends on the
+    update's length and not on the number of rules.
+
+    Args:
+        update (List[int]): The update to sort.
+        rule_index (RuleIndex): The rules compiled by `build_rule_index`.
+
+    Returns:
+        List[int]: The sorted update.
+    """
+    return _sort_by_successors(update, _update_successors(update, rule_index))
+
+
 def sort_update(update: List[int], rules: List[Tuple[int, int]]) -> List[int]:
     """
     Sorts an update according to the given rules.
@@ -93,15 +181,165 @@ def sort_update(update: List[int], rules: List[Tuple[int, int]]) -> List[int]:
     Returns:
         List[int]: The sorted update.
     """
-    sorter = TopologicalSorter()
+    return sort_update_with_index(update, build_rule_index(rules))
 
-    # Build the graph with the relevant rules
-    for x, y in rules:
-        if x in update and y in update:
-            sorter.add_edge(x, y)
 
-    # Perform the topological sort
-    return sorter.sort(update)
+def middle_page_with_index(update: List[int], rule_index: RuleIndex) -> int:
+    """
+    Finds the middle page of the corrected update without sorting it.
+
+    Each page is given the position `len(update) - 1 - s`, where `s` is its number of
+    successors within the update. When these positions are all distinct and each
+    page's successors are those of the next page plus that page itself, every page
+    must come before all later pages and after none, so this is the only order the
+    rules allow and the one sorting gives. The middle page is then the one at position
+    `len(update) // 2`. Otherwise the rules leave some pairs unordered or contain a
+    cycle, and the update is sorted instead, which raises on a cycle. The sort reuses
+    the successor sets, so it costs no more than `sort_update_with_index`.
+
+    Args:
+        update (List[int]): The update to correct.
+        rule_index (RuleIndex): The rules compiled by `build_rule_index`.
+
+    Returns:
+        int: The page at index `len(update) // 2` of `sort_update_with_index`'s result.
+
+    Raises:
+        ValueError: If the rules between pages of the update contain a cycle.
+    """
+    successors = _update_successors(update, rule_index)
+    last = len(update) - 1
+    order = {last - len(after): page for page, after in successors.items()}
+    # A page listed as its own successor could push a position below zero
+    if len(successors) == len(order) == len(update) and min(order, default=0) == 0:
+        # Successor sets shrink by exactly the next page, so no rule points backwards
+        if all(
+            order[i + 1] in successors[order[i]]
+            and successors[order[i + 1]] < successors[order[i]]
+            for i in range(last)
+        ):
+            return order[len(update) // 2]
+    return _sort_by_successors(update, successors)[len(update) // 2]
+
+
+@dataclass
+class RuleEngine:
+    """
+    Keeps the part 1 and part 2 sums of fixed updates current while rules change.
+
+    A rule (x, y) can only change the outcome of updates holding both x and y, so the
+    engine indexes the updates holding each page, and on `add_rule`/`remove_rule`
+    re-validates and re-sorts only the updates found in both pages' postings.
+
+    Attributes:
+        rules (InitVar[List[Tuple[int, int]]]): The initial ordering rules. The
+            current rules are kept in `rule_index` only.
+        updates (List[List[int]]): The updates, which are not copied.
+    """
+
+    rules: InitVar[List[Tuple[int, int]]]
+    updates: List[List[int]]
+
+    def __post_init__(self, rules: List[Tuple[int, int]]):
+        """
+        Compiles the rules, indexes the updates by page and computes both sums once.
+        """
+        self.rule_index: RuleIndex = build_rule_index(rules)
+        self._updates_with_page: Dict[int, Set[int]] = {}
+        for update_id, update in enumerate(self.updates):
+            for page in update:
+                self._updates_with_page.setdefault(page, set()).add(update_id)
+        # What each update adds to part 1 (if valid) or part 2 (if invalid)
+        self._contributions: List[Tuple[int, int]] = [
+            self._evaluate(update) for update in self.updates
+        ]
+        self.part1 = sum(part1 for part1, _ in self._contributions)
+        self.part2 = sum(part2 for _, part2 in self._contributions)
+
+    def _evaluate(self, update: List[int]) -> Tuple[int, int]:
+        """
+        Get the (part 1, part 2) contribution of an update under the current rules.
+        """
+        if is_update_valid_with_index(update, self.rule_index):
+            return update[len(update) // 2], 0
+        return 0, middle_page_with_index(update, self.rule_index)
+
+    def affected_updates(self, x: int, y: int) -> Set[int]:
+        """
+        Get the ids of the updates holding both pages of a rule.
+        """
+        with_x = self._updates_with_page.get(x, set())
+        with_y = self._updates_with_page.get(y, set())
+        return with_x & with_y
+
+    def _reaches(self, update_id: int, start: int, target: int) -> bool:
+        """
+        Check if the rules between pages of an update lead from `start` to `target`.
+        """
+        pages = set(self.updates[update_id])
+        seen = {start}
+        stack = [start]
+        while stack:
+            for page in self.rule_index.get(stack.pop(), NO_SUCCESSORS) & pages:
+                if page == target:
+                    return True
+                if page not in seen:
+                    seen.add(page)
+                    stack.append(page)
+        return False
+
+    def _refresh(self, update_ids: Iterable[int]) -> None:
+        """
+        Re-evaluates some updates, applying the changes only once all of them succeed.
+        """
+        changes = [
+            (update_id, self._evaluate(self.updates[update_id]))
+            for update_id in update_ids
+        ]
+        for update_id, (part1, part2) in changes:
+            old_part1, old_part2 = self._contributions[update_id]
+            self.part1 += part1 - old_part1
+            self.part2 += part2 - old_part2
+            self._contributions[update_id] = (part1, part2)
+
+    def add_rule(self, x: int, y: int) -> None:
+        """
+        Adds the rule that page `x` must come before page `y`.
+
+        Raises:
+            ValueError: If the rule orders a page before itself, or creates a cycle
+                within an affected update, i.e. the rules between its pages already
+                lead from `y` back to `x`. The rule is then not added.
+        """
+        if x == y:
+            raise ValueError(f"Rule {x}|{y} creates a cycle on page {x}")
+        if y in self.rule_index.get(x, NO_SUCCESSORS):
+            return
+        affected = self.affected_updates(x, y)
+        for update_id in affected:
+            if self._reaches(update_id, y, x):
+                raise ValueError(f"Rule {x}|{y} creates a cycle in update {update_id}")
+        self.rule_index.setdefault(x, set()).add(y)
+        try:
+            self._refresh(affected)
+        except ValueError:
+            self._discard_rule(x, y)
+            raise
+
+    def remove_rule(self, x: int, y: int) -> None:
+        """
+        Removes the rule that page `x` must come before page `y`, if present.
+        """
+        if y not in self.rule_index.get(x, NO_SUCCESSORS):
+            return
+        self._discard_rule(x, y)
+        self._refresh(self.affected_updates(x, y))
+
+    def _discard_rule(self, x: int, y: int) -> None:
+        successors = self.rule_index[x]
+        successors.discard(y)
+        if not successors:
+            del self.rule_index[x]
 
 
 def part1(data: List[str]) -> int:
@@ -115,8 +353,9 @@ def part1(data: List[str]) -> int:
         int: The count of valid updates.
     """
     rules, updates = parse_rules_and_updates(data)
-    valid_updates = filter_updates(updates, rules, valid=True)
-    return middle_page_sum(valid_updates)
+    rule_index = build_rule_index(rules)
+    valid_indices = filter_updates(updates, rule_index, valid=True)
+    return middle_page_sum(updates[index] for index in valid_indices)
 
 
 def part2(data: List[str]) -> int:
@@ -130,9 +369,12 @@ def part2(data: List[str]) -> int:
         int: The sum of the middle pages of corrected updates.
     """
     rules, updates = parse_rules_and_updates(data)
-    invalid_updates = filter_updates(updates, rules, valid=False)
-    corrected_updates = [sort_update(update, rules) for update in invalid_updates]
-    return middle_page_sum(corrected_updates)
+    rule_index = build_rule_index(rules)
+    invalid_indices = filter_updates(updates, rule_index, valid=False)
+    # Only the middle page of each corrected update is needed, not the whole order
+    return sum(
+        middle_page_with_index(updates[index], rule_index) for index in invalid_indices
+    )
 
 
 if __name__ == "__main__":
@@ -1,10 +1,18 @@
 import pytest
+import random
 from pathlib import Path
 from .day05_solution import (
     parse_rules_and_updates,
     is_update_valid,
     middle_page_sum,
     sort_update,
+    build_rule_index,
+    sort_update_with_index,
+    is_update_valid_with_index,
+    validate_updates,
+    filter_updates,
+    middle_page_with_index,
+    RuleEngine,
     part1,
     part2,
 )
@@ -84,6 +92,83 @@ def test_sort_update() -> None:
     assert sort_update([4, 3, 2, 1], independent_rules) == [1, 2, 3, 4]
 
 
+def test_sort_update_with_index() -> None:
+    """
+    Test sorting with a compiled rule index against sorting with the rule list.
+    """
+    assert build_rule_index(TEST_RULES) == {47: {53}, 97: {13, 61, 47}, 75: {29}}
+
+    with TEST_INPUT_FILE.open("r") as file:
+        rules, updates = parse_rules_and_updates(file.read().splitlines())
+    rule_index = build_rule_index(rules)
+    for update in updates:
+        assert sort_update_with_index(update, rule_index) == sort_update(update, rules)
+    assert sort_update_with_index([4, 3, 2, 1], {}) == [1, 2, 3, 4]
+
+
+def test_indexed_validation_matches_rule_scan() -> None:
+    """
+    Test the indexed validator, batch validation and index filtering against
+    checking the positions of every rule.
+    """
+    rng = random.Random(23)
+    rules = [tuple(rng.sample(range(10, 40), 2)) for _ in range(120)]
+    updates = [rng.sample(range(10, 40), rng.randrange(1, 9)) for _ in range(300)]
+    rule_index = build_rule_index(rules)
+
+    expected = []
+    for update in updates:
+        position = {page: i for i, page in enumerate(update)}
+        expected.append(
+            all(
+                position[x] < position[y]
+                for x, y in rules
+                if x in position and y in position
+            )
+        )
+        assert is_update_valid_with_index(update, rule_index) == expected[-1]
+    assert validate_updates(updates, rule_index) == expected
+    assert filter_updates(updates, rule_index) == [
+        i for i, is_valid in enumerate(expected) if is_valid
+    ]
+    assert filter_updates(updates, rule_index, valid=False) == [
+        i for i, is_valid in enumerate(expected) if not is_valid
+    ]
+
+
+@pytest.mark.parametrize("rule_share", [1.0, 0.6])
+def test_middle_page_matches_sorting(rule_share: float) -> None:
+    """
+    Test middle-page selection against sorting, with every pair of pages ordered by
+    a rule and with only some of them, which falls back to sorting.
+    """
+    rng = random.Random(int(rule_share * 10))
+    order = rng.sample(range(10, 99), 25)
+    rules = [
+        (order[i], order[j])
+        for i in range(25)
+        for j in range(i + 1, 25)
+        if rng.random() < rule_share
+    ]
+    rule_index = build_rule_index(rules)
+    for _ in range(200):
+        update = rng.sample(order, rng.randrange(1, 12))
+        expected = sort_update_with_index(update, rule_index)[len(update) // 2]
+        assert middle_page_with_index(update, rule_index) == expected
+
+
+def test_middle_page_surfaces_cycles() -> None:
+    """
+    Test that a cycle whose successor counts still look like a permutation is found.
+    """
+    rules = [(10, 20), (10, 30), (10, 40), (30, 20), (30, 40), (20, 10)]
+    rule_index = build_rule_index(rules)
+    with pytest.raises(ValueError):
+        sort_update_with_index([40, 30, 20, 10], rule_index)
+    with pytest.raises(ValueError):
+        middle_page_with_index([40, 30, 20, 10], rule_index)
+
+
 def test_part1() -> None:
     """
     Test Part 2 with example input from test_input.txt.
@@ -102,3 +187,68 @@ def test_part2() -> None:
         data = file.read().splitlines()
     expected_result = 123
     assert part2(data) == expected_result
+
+
+def test_rule_engine_rejects_cycles() -> None:
+    """
+    Test that a rule closing a cycle within an update is rejected and not kept.
+    """
+    rules = [(10, 20), (10, 30), (10, 40), (30, 20), (30, 40)]
+    engine = RuleEngine(rules, [[40, 30, 20, 10]])
+    assert (engine.part1, engine.part2) == (0, 20)
+    for x, y in [(20, 10), (40, 10), (20, 30)]:
+        with pytest.raises(ValueError):
+            engine.add_rule(x, y)
+        assert engine.rule_index == build_rule_index(rules)
+        assert (engine.part1, engine.part2) == (0, 20)
+    # Pages that never share an update may still be ordered either way
+    engine.add_rule(20, 99)
+    assert (engine.part1, engine.part2) == (0, 20)
+
+
+@pytest.mark.parametrize("page", [30, 99])
+def test_rule_engine_rejects_self_rules(page: int) -> None:
+    """
+    Test that a page ordered before itself is rejected, whether or not updates hold it.
+    """
+    rules = [(10, 20), (30, 20)]
+    engine = RuleEngine(rules, [[20, 30, 10]])
+    with pytest.raises(ValueError, match="cycle"):
+        engine.add_rule(page, page)
+    assert engine.rule_index == build_rule_index(rules)
+    assert (engine.part1, engine.part2) == (0, 30)
+
+
+def test_rule_engine_tracks_rule_changes() -> None:
+    """
+    Test the incrementally maintained sums against recomputing them after each change.
+    """
+    with TEST_INPUT_FILE.open("r") as file:
+        rules, updates = parse_rules_and_updates(file.read().splitlines())
+    engine = RuleEngine(rules, updates)
+    assert (engine.part1, engine.part2) == (143, 123)
+
+    rng = random.Random(2)
+    current = set(rules)
+    for _ in range(60):
+        if current and rng.random() < 0.5:
+            x, y = rng.choice(sorted(current))
+            engine.remove_rule(x, y)
+            current.discard((x, y))
+        else:
+            pages = sorted({page for update in updates for page in update})
+            x, y = rng.sample(pages, 2)
+            try:
+                engine.add_rule(x, y)
+                current.add((x, y))
+            except ValueError:
+                # A cycle: the engine must be left as it was
+                assert (x, y) not in current
+        rule_index = build_rule_index(sorted(current))
+        valid = filter_updates(updates, rule_index)
+        invalid = filter_updates(updates, rule_index, valid=False)
+        assert engine.rule_index == rule_index
+        assert engine.part1 == middle_page_sum(updates[i] for i in valid)
+        assert engine.part2 == middle_page_sum(
+            sort_update_with_index(updates[i], rule_index) for i in invalid
+        )
@@ -0,0 +1,203 @@
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Dict, Iterable, List, Sequence, Tuple
+
+from shared.utils import EIGHT_DIRECTIONS, stencil_variants
+
+if TYPE_CHECKING:
+    from shared.data_classes import Grid
+
+
+@dataclass
+class Bitboard:
+    """
+    A character grid stored as one arbitrary-precision int per distinct character.
+
+    Cell (x, y) is bit `y * width + x` of its character's board, where `width` is the
+    number of columns plus one guard column that is always empty. Stepping one cell in
+    any direction is a shift by `dy * width + dx`, and the guard column stops a
+    horizontal or diagonal step from wrapping into the next row, so every cell of the
+    grid is matched against a pattern at once with shifts and ANDs. Only the standard
+    library is used.
+
+    Attributes:
+        rows (int): Number of rows of the grid.
+        cols (int): Number of columns of the grid.
+        boards (Dict[str, int]): For each character, the bits of the cells holding it.
+    """
+
+    rows: int
+    cols: int
+    boards: Dict[str, int] = field(default_factory=dict)
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "Bitboard":
+        """
+        Builds the boards from lines of equal length.
+
+        Each board comes from translating the whole grid text into a binary string,
+        so the conversion runs at C speed.
+
+        Raises:
+            ValueError: If the lines differ in length.
+        """
+        rows = [line.strip() for line in lines]
+        cols = len(rows[0]) if rows else 0
+        if any(len(row) != cols for row in rows):
+            raise ValueError("All grid rows must have the same length")
+        # The newline ending each row fills the guard column, and int() reads the most
+        # significant bit first, so the text is reversed once for every board
+        text = "".join(row + "\n" for row in rows)[::-1]
+        alphabet = set(text)
+        boards = {}
+        for char in alphabet - {"\n"}:
+            table = str.maketrans({c: "1" if c == char else "0" for c in alphabet})
+            boards[char] = int(text.translate(table), 2)
+        return cls(len(rows), cols, boards)
+
+    @classmethod
+    def from_grid(cls, grid: "Grid") -> "Bitboard":
+        """
+        Builds the boards from a `Grid` of single-character cells.
+        """
+        return cls.from_lines("".join(row) for row in grid.data)
+
+    @property
+    def width(self) -> int:
+        return self.cols + 1
+
+    def board(self, char: str) -> int:
+        """
+        Get the bits of the cells holding a character, 0 if it is not in the grid.
+        """
+        return self.boards.get(char, 0)
+
+    def cells(self, mask: int) -> List[Tuple[int, int]]:
+        """
+        List the (x, y) of every set bit of a mask, in row-major order.
+        """
+        width = self.width
+        # bin() lists the most significant bit first, after its "0b" prefix
+        bits = bin(mask)[:1:-1]
+        return [
+            (index % width, index // width)
+            for index, bit in enumerate(bits)
+            if bit == "1"
+        ]
+
+    def word_matches(self, word: str, dx: int, dy: int) -> int:
+        """
+        The mask of the cells where the word starts, read with the given step.
+
+        Letter `i` must sit `i` steps away from the start, so its board is shifted
+        back by `i` steps and all the shifted boards are ANDed together.
+
+        Raises:
+            ValueError: If the step is not to a neighbouring cell, which the single
+                guard column cannot keep from wrapping.
+        """
+        if abs(dx) > 1 or abs(dy) > 1:
+            raise ValueError(f"Unsupported step: ({dx}, {dy})")
+        if not word:
+            return 0
+        step = dy * self.width + dx
+        mask = self.board(word[0])
+        for i, char in enumerate(word[1:], start=1):
+            shift = step * i
+            board = self.board(char)
+            mask &= board >> shift if shift >= 0 else board << -shift
+            if not mask:
+                break
+        return mask
+
+    def word_counts(
+        self,
+        word: str,
+        directions: Iterable[Tuple[int, int]] = EIGHT_DIRECTIONS,
+    ) -> Dict[Tuple[int, int], int]:
+        """
+        Count the occurrences of a word in each direction.
+
+        Args:
+            word (str): The word to search for.
+            directions (Iterable[Tuple[int, int]]): The (dx, dy) steps to search along.
+
+        Returns:
+            Dict[Tuple[int, int], int]: The number of matches for each direction.
+        """
+        return {
+            (dx, dy): self.word_matches(word, dx, dy).bit_count()
+            for dx, dy in directions
+        }
+
+    def anchor_mask(self, height: int, width: int) -> int:
+        """
+        The mask of the cells that can be the top-left corner of a height x width
+        pattern.
+
+        Raises:
+            ValueError: If the pattern is empty.
+        """
+        if height <= 0 or width <= 0:
+            raise ValueError("A pattern must have at least one cell")
+        fitting_cols = max(0, self.cols - width + 1)
+        fitting_rows = max(0, self.rows - height + 1)
+        row = "1" * fitting_cols + "0" * (self.width - fitting_cols)
+        return int((row * fitting_rows)[::-1] or "0", 2)
+
+    def stencil_matches(
+        self, stencil: Sequence[str], wildcard: str = ".", anchors: int | None = None
+    ) -> int:
+        """
+        The mask of the top-left cells where a 2-D pattern matches.
+
+        Pattern cells more than one column right of the anchor could wrap past the
+        guard column, so the result is restricted to the anchors where the pattern fits.
+
+        Args:
+            stencil (Sequence[str]): The pattern, one string per row.
+            wildcard (str): The character marking cells that match anything.
+            anchors (int | None): The pattern's `anchor_mask`, if already computed.
+
+        Returns:
+            int: The mask of the matching anchor cells.
+        """
+        if anchors is None:
+            anchors = self.anchor_mask(len(stencil), len(stencil[0]))
+        mask = anchors
+        width = self.width
+        for dy, row in enumerate(stencil):
+            for dx, char in enumerate(row):
+                if char != wildcard:
+                    mask &= self.board(char) >> (dy * width + dx)
+        return mask
+
+    def match_stencil(
+        self,
+        stencil: Sequence[str],
+        wildcard: str = ".",
+        rotate: bool = False,
+        reflect: bool = False,
+    ) -> int:
+        """
+        Count the placements of a 2-D pattern, optionally in any orientation.
+
+        Args:
+            stencil (Sequence[str]): The pattern, one string per row.
+            wildcard (str): The character marking cells that match anything.
+            rotate (bool): Also match the pattern rotated by 90, 180 and 270 degrees.
+            reflect (bool): Also match the mirror image of every orientation.
+
+        Returns:
+            int: The number of (placement, orientation) matches. Orientations that look
+                the same are only counted once.
+        """
+        count = 0
+        # Rotations share at most two shapes, so each anchor mask is built only once
+        anchor_masks: Dict[Tuple[int, int], int] = {}
+        for variant in stencil_variants(stencil, rotate, reflect):
+            shape = (len(variant), len(variant[0]))
+            if shape not in anchor_masks:
+                anchor_masks[shape] = self.anchor_mask(*shape)
+            matches = self.stencil_matches(variant, wildcard, anchor_masks[shape])
+            count += matches.bit_count()
+        return count
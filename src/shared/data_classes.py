@@ -1,13 +1,51 @@
+from abc import ABC, abstractmethod
+from bisect import bisect_right
 from collections import defaultdict, deque
+from concurrent.futures import ProcessPoolExecutor
 from dataclasses import dataclass
-from typing import List, Tuple, Any, Dict
+from functools import partial
+from itertools import repeat
+from multiprocessing.shared_memory import SharedMemory
+from pathlib import Path
+import heapq
+import mmap
+from typing import (
+    Any,
+    Callable,
+    Dict,
+    Iterable,
+    Iterator,
+    List,
+    Optional,
+    Sequence,
+    Sized,
+    Tuple,
+)
+import numpy as np
 
+from shared.utils import (
+    CARDINAL_OFFSETS,
+    DIAGONAL_OFFSETS,
+    EIGHT_DIRECTIONS,
+    stencil_variants,
+)
 
-@dataclass
+# Rows of start cells evaluated at once by the vectorized searches, to bound memory
+SEARCH_BLOCK_ROWS = 1024
+# Parallel scans never split the grid into bands thinner than this many rows
+MIN_BAND_ROWS = 64
+# Bytes of a mapped grid file checked for stray newlines at once, to bound memory
+SHAPE_CHECK_BYTES = 1 << 20
+
+
+@dataclass(frozen=True, slots=True)
 class Point:
     """
     Represents a point in 2D space.
 
+    Points are immutable and hashable, so they can be used in visited sets and as
+    dictionary keys, and take no per-instance `__dict__`.
+
     Attributes:
         x (int): The x-coordinate of the point.
         y (int): The y-coordinate of the point.
@@ -26,7 +64,504 @@ class Point:
 
 
 @dataclass
-class Grid:
+class PointArray:
+    """
+    Many points stored as two int64 coordinate arrays, for bulk frontier operations.
+
+    Arithmetic, bounds checks and neighbour generation apply to every point at once.
+
+    Attributes:
+        xs (np.ndarray): The x-coordinates of the points.
+        ys (np.ndarray): The y-coordinates of the points.
+    """
+
+    xs: np.ndarray
+    ys: np.ndarray
+
+    def __post_init__(self):
+        self.xs = np.asarray(self.xs, dtype=np.int64)
+        self.ys = np.asarray(self.ys, dtype=np.int64)
+        if self.xs.shape != self.ys.shape or self.xs.ndim != 1:
+            raise ValueError("Coordinates must be 1-D arrays of the same length")
+
+    @classmethod
+    def from_points(cls, points: Iterable[Point]) -> "PointArray":
+        """
+        Builds the array from `Point`s or (x, y) pairs.
+        """
+        coordinates = [
+            (point.x, point.y) if isinstance(point, Point) else point
+            for point in points
+        ]
+        if not coordinates:
+            return cls(np.empty(0), np.empty(0))
+        xs, ys = zip(*coordinates)
+        return cls(np.array(xs), np.array(ys))
+
+    def __len__(self) -> int:
+        return self.xs.size
+
+    def __iter__(self) -> Iterator[Point]:
+        return map(Point, self.xs.tolist(), self.ys.tolist())
+
+    def __getitem__(self, index: Any) -> "Point | PointArray":
+        """
+        Get one point by integer index, or a new array by slice, index array or mask.
+        """
+        if isinstance(index, (int, np.integer)):
+            return Point(int(self.xs[index]), int(self.ys[index]))
+        return PointArray(self.xs[index], self.ys[index])
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, PointArray):
+            return NotImplemented
+        return np.array_equal(self.xs, other.xs) and np.array_equal(self.ys, other.ys)
+
+    def __add__(self, other: "Point | PointArray") -> "PointArray":
+        """Adds a point to every point, or two arrays point by point."""
+        xs, ys = _coordinates(other)
+        return PointArray(self.xs + xs, self.ys + ys)
+
+    def __sub__(self, other: "Point | PointArray") -> "PointArray":
+        """Subtracts a point from every point, or two arrays point by point."""
+        xs, ys = _coordinates(other)
+        return PointArray(self.xs - xs, self.ys - ys)
+
+    def in_bounds(self, cols: int, rows: int) -> np.ndarray:
+        """
+        Get a boolean mask of the points inside a cols x rows grid.
+        """
+        return (self.xs >= 0) & (self.xs < cols) & (self.ys >= 0) & (self.ys < rows)
+
+    def neighbors(self, include_diagonals: bool = False) -> "PointArray":
+        """
+        Get the neighbours of every point, in the order of `shared.utils.neighbors`.
+
+        Args:
+            include_diagonals (bool): Whether to include diagonal neighbours.
+
+        Returns:
+            PointArray: The neighbours of the first point, then of the second, etc.
+        """
+        offsets = CARDINAL_OFFSETS
+        if include_diagonals:
+            offsets += DIAGONAL_OFFSETS
+        dxs, dys = np.array(offsets, dtype=np.int64).T
+        return PointArray(
+            (self.xs[:, None] + dxs).ravel(), (self.ys[:, None] + dys).ravel()
+        )
+
+    def flat_indices(self, cols: int) -> np.ndarray:
+        """
+        Get the row-major index `y * cols + x` of every point, e.g. into a raveled grid.
+        """
+        return self.ys * cols + self.xs
+
+    def unique(self) -> "PointArray":
+        """
+        Get the distinct points, sorted by y and then x.
+        """
+        if not len(self):
+            return self
+        order = np.lexsort((self.xs, self.ys))
+        xs, ys = self.xs[order], self.ys[order]
+        keep = np.ones(xs.size, dtype=bool)
+        keep[1:] = (xs[1:] != xs[:-1]) | (ys[1:] != ys[:-1])
+        return PointArray(xs[keep], ys[keep])
+
+
+def _coordinates(points: Point | PointArray) -> Tuple[Any, Any]:
+    """
+    Get the x and y of a point, or the coordinate arrays of a point array.
+    """
+    if isinstance(points, PointArray):
+        return points.xs, points.ys
+    return points.x, points.y
+
+
+@dataclass(frozen=True)
+class GridLine:
+    """
+    One straight line of grid cells joined into a string.
+
+    Attributes:
+        text (str): The characters of the line, in order.
+        x (int): The column of the line's first cell.
+        y (int): The row of the line's first cell.
+        dx (int): The column step from one cell of the line to the next.
+        dy (int): The row step from one cell of the line to the next.
+    """
+
+    text: str
+    x: int
+    y: int
+    dx: int
+    dy: int
+
+    def position(self, index: int) -> Tuple[int, int]:
+        """
+        Map an index into `text` back to the (x, y) of its grid cell.
+        """
+        return self.x + self.dx * index, self.y + self.dy * index
+
+
+class GridSearchMixin(ABC):
+    """
+    Vectorized searches shared by the grid classes holding single-character cells.
+
+    Subclasses provide `to_array`, returning the grid as a (rows, cols) uint8 array,
+    and `_line_cache`, `_char_index` and `_prefix_sums` attributes, starting as None.
+    When a cell changes they reset `_line_cache` and call `_reindex_cell`.
+    """
+
+    __slots__ = ()
+
+    @abstractmethod
+    def to_array(self) -> np.ndarray:
+        """
+        Get the grid as a (rows, cols) uint8 array of Latin-1 character codes.
+        """
+
+    def word_counts(
+        self,
+        word: str,
+        directions: Iterable[Tuple[int, int]] = EIGHT_DIRECTIONS,
+        workers: int = 1,
+    ) -> Dict[Tuple[int, int], int]:
+        """
+        Count the occurrences of a word in each direction, over the whole grid at once.
+
+        Args:
+            word (str): The word to search for.
+            directions (Iterable[Tuple[int, int]]): The (dx, dy) steps to search along.
+            workers (int): Processes scanning horizontal bands of the grid in parallel.
+
+        Returns:
+            Dict[Tuple[int, int], int]: The number of matches for each direction.
+
+        Example:
+            >>> Grid([list("XMAS"), list("MMAS")]).word_counts("AM", [(-1, 0), (0, 1)])
+            {(-1, 0): 2, (0, 1): 0}
+        """
+        directions = list(directions)
+        counts = {direction: 0 for direction in directions}
+        scan = partial(_band_word_counts, word=word, directions=directions)
+        for band_counts in _scan_in_bands(self.to_array(), scan, workers):
+            for direction, count in band_counts.items():
+                counts[direction] += count
+        return counts
+
+    def word_positions(
+        self,
+        word: str,
+        directions: Iterable[Tuple[int, int]] = EIGHT_DIRECTIONS,
+    ) -> Dict[Tuple[int, int], np.ndarray]:
+        """
+        Find the start cells of every occurrence of a word, for each direction.
+
+        Args:
+            word (str): The word to search for.
+            directions (Iterable[Tuple[int, int]]): The (dx, dy) steps to search along.
+
+        Returns:
+            Dict[Tuple[int, int], np.ndarray]: For each direction, an (n, 2) array of
+                the (x, y) cells where a match starts, in row-major order.
+        """
+        directions = list(directions)
+        found: Dict[Tuple[int, int], List[np.ndarray]] = {
+            direction: [] for direction in directions
+        }
+        for direction, x0, y0, mask in _word_match_masks(
+            self.to_array(), word, directions
+        ):
+            ys, xs = np.nonzero(mask)
+            found[direction].append(np.column_stack((xs + x0, ys + y0)))
+        return {
+            direction: (
+                np.concatenate(blocks) if blocks else np.empty((0, 2), dtype=np.intp)
+            )
+            for direction, blocks in found.items()
+        }
+
+    def lines(self) -> List["GridLine"]:
+        """
+        Every row, column, diagonal and anti-diagonal of the grid as a string.
+
+        The lines are built on first use and cached until the grid is modified through
+        `set`, so repeated searches run `str.count`, `str.find` or a regex over them at
+        C speed instead of stepping cell by cell.
+
+        Returns:
+            List[GridLine]: The rows top to bottom, the columns left to right, then the
+                diagonals and anti-diagonals interleaved.
+        """
+        if self._line_cache is None:
+            self._line_cache = list(_grid_lines(self.to_array()))
+        return self._line_cache
+
+    def count_word(self, word: str) -> int:
+        """
+        Count the occurrences of a word in all eight directions using the cached lines.
+
+        Each line is searched for the word and for its reverse, the occurrences read
+        against the line's direction. Overlapping occurrences are all counted, and a
+        palindrome is counted once in each of two opposite directions, as with
+        `word_counts`.
+
+        Args:
+            word (str): The word to count.
+
+        Returns:
+            int: The total number of occurrences.
+        """
+        if not word:
+            return 0
+        count = _count_overlapping if _overlaps_itself(word) else str.count
+        return sum(
+            count(line.text, spelling)
+            for line in self.lines()
+            for spelling in (word, word[::-1])
+        )
+
+    def find_words(
+        self, words: Iterable[str]
+    ) -> Dict[str, List[Tuple[int, int, int, int]]]:
+        """
+        Find many words in all eight directions with a single traversal of the grid.
+
+        Every word and its reverse go into one Aho-Corasick automaton, and each row,
+        column, diagonal and anti-diagonal is streamed through it once. A match of a
+        reversed word is an occurrence read against the line's direction. As with
+        `word_counts`, a palindrome is found once in each of two opposite directions.
+
+        Args:
+            words (Iterable[str]): The words to search for.
+
+        Returns:
+            Dict[str, List[Tuple[int, int, int, int]]]: For each word, the
+                (x, y, dx, dy) of every occurrence: the cell of its first letter and
+                the step to the next one. The number of occurrences is the length of
+                the list.
+        """
+        unique_words = [word for word in dict.fromkeys(words) if word]
+        # Each automaton pattern maps back to the words it spells forwards or backwards
+        spellings: Dict[str, List[Tuple[str, bool]]] = defaultdict(list)
+        for word in unique_words:
+            spellings[word].append((word, False))
+            spellings[word[::-1]].append((word, True))
+        patterns = list(spellings)
+        automaton = AhoCorasick(patterns)
+
+        found: Dict[str, List[Tuple[int, int, int, int]]] = {
+            word: [] for word in unique_words
+        }
+        for line in self.lines():
+            x0, y0, dx, dy = line.x, line.y, line.dx, line.dy
+            for end, index in automaton.iter_matches(line.text):
+                start = end - len(patterns[index]) + 1
+                for word, is_reversed in spellings[patterns[index]]:
+                    if is_reversed:
+                        found[word].append((x0 + dx * end, y0 + dy * end, -dx, -dy))
+                    else:
+                        found[word].append((x0 + dx * start, y0 + dy * start, dx, dy))
+        return found
+
+    def match_stencil(
+        self,
+        stencil: Sequence[str],
+        wildcard: str = ".",
+        rotate: bool = False,
+        reflect: bool = False,
+        workers: int = 1,
+    ) -> int:
+        """
+        Count the placements of a small 2-D pattern, optionally in any orientation.
+
+        Each distinct orientation is evaluated over every anchor cell at once, by ANDing
+        the shifted slices of the grid that its non-wildcard cells must match.
+
+        Args:
+            stencil (Sequence[str]): The pattern, one string per row.
+            wildcard (str): The character marking cells that match anything.
+            rotate (bool): Also match the pattern rotated by 90, 180 and 270 degrees.
+            reflect (bool): Also match the mirror image of every orientation.
+            workers (int): Processes scanning horizontal bands of the grid in parallel.
+
+        Returns:
+            int: The number of (placement, orientation) matches. Orientations that look
+                the same are only counted once.
+
+        Example:
+            >>> grid = Grid([list("M.S"), list(".A."), list("M.S")])
+            >>> grid.match_stencil(["M.M", ".A.", "S.S"], rotate=True)
+            1
+        """
+        scan = partial(
+            _band_stencil_count,
+            variants=stencil_variants(stencil, rotate, reflect),
+            wildcard=wildcard,
+        )
+        return sum(_scan_in_bands(self.to_array(), scan, workers))
+
+    def char_positions(self, char: str) -> np.ndarray:
+        """
+        Get the cells holding a character, from an index built on first use.
+
+        The index maps every character to its sorted flat positions `y * cols + x`.
+        It is built with one sort of the grid and then kept up to date by `set`, so
+        later lookups never rescan the grid.
+
+        Args:
+            char (str): The character to look up.
+
+        Returns:
+            np.ndarray: The sorted flat positions, where `divmod(position, cols)` gives
+                (y, x).
+        """
+        if self._char_index is None:
+            flat = np.ascontiguousarray(self.to_array()).ravel()
+            order = np.argsort(flat, kind="stable")
+            counts = np.bincount(flat, minlength=256)
+            ends = np.cumsum(counts)
+            self._char_index = {
+                chr(code): order[ends[code] - counts[code] : ends[code]]
+                for code in np.flatnonzero(counts)
+            }
+        return self._char_index.get(char, np.empty(0, dtype=np.intp))
+
+    def count_in_rectangle(self, char: str, x0: int, y0: int, x1: int, y1: int) -> int:
+        """
+        Count the cells holding a character in the rectangle [x0, x1) x [y0, y1).
+
+        Each character gets a 2-D prefix-sum table on first use, so every count is four
+        lookups. `set` drops only the tables of the characters it replaces.
+
+        Args:
+            char (str): The character to count.
+            x0 (int): First column of the rectangle.
+            y0 (int): First row of the rectangle.
+            x1 (int): Column just past the rectangle.
+            y1 (int): Row just past the rectangle.
+
+        Returns:
+            int: The number of matching cells, 0 for an empty rectangle.
+        """
+        rows, cols = self.get_grid_dimensions()
+        x0, y0, x1, y1 = max(x0, 0), max(y0, 0), min(x1, cols), min(y1, rows)
+        if x0 >= x1 or y0 >= y1:
+            return 0
+        if self._prefix_sums is None:
+            self._prefix_sums = {}
+        table = self._prefix_sums.get(char)
+        if table is None:
+            table = np.zeros((rows + 1, cols + 1), dtype=np.int64)
+            if len(char) == 1 and ord(char) <= 0xFF:
+                matches = self.to_array() == ord(char)
+                table[1:, 1:] = matches.cumsum(axis=0).cumsum(axis=1)
+            self._prefix_sums[char] = table
+        return int(table[y1, x1] - table[y0, x1] - table[y1, x0] + table[y0, x0])
+
+    def indexed_word_counts(
+        self,
+        word: str,
+        directions: Iterable[Tuple[int, int]] = EIGHT_DIRECTIONS,
+    ) -> Dict[Tuple[int, int], int]:
+        """
+        Count the occurrences of a word in each direction, starting from indexed cells.
+
+        Only the cells holding the word's rarest letter are gathered and checked, so
+        repeated searches cost time in the number of candidates, not the grid size.
+
+        Args:
+            word (str): The word to search for.
+            directions (Iterable[Tuple[int, int]]): The (dx, dy) steps to search along.
+
+        Returns:
+            Dict[Tuple[int, int], int]: The number of matches for each direction.
+        """
+        return {
+            (dx, dy): self._count_gathered(
+                [(dx * i, dy * i, char) for i, char in enumerate(word)]
+            )
+            for dx, dy in directions
+        }
+
+    def indexed_match_stencil(
+        self,
+        stencil: Sequence[str],
+        wildcard: str = ".",
+        rotate: bool = False,
+        reflect: bool = False,
+    ) -> int:
+        """
+        Count the placements of a 2-D pattern like `match_stencil`, from indexed cells.
+
+        Each orientation is only tried around the cells holding its rarest character.
+        """
+        return sum(
+            self._count_gathered(
+                [
+                    (dx, dy, char)
+                    for dy, row in enumerate(variant)
+                    for dx, char in enumerate(row)
+                    if char != wildcard
+                ]
+            )
+            for variant in stencil_variants(stencil, rotate, reflect)
+        )
+
+    def _count_gathered(self, cells: List[Tuple[int, int, str]]) -> int:
+        """
+        Count the anchors where every (dx, dy, char) cell of a pattern matches.
+
+        The candidates come from the positions of the pattern's rarest character. Those
+        that would put the pattern out of bounds are dropped at once, and the rest are
+        narrowed by gathering the other cells, rarest character first.
+        """
+        if not cells or any(ord(char) > 0xFF for _, _, char in cells):
+            return 0
+        rows, cols = self.get_grid_dimensions()
+        cells = sorted(cells, key=lambda cell: self.char_positions(cell[2]).size)
+        pivot_dx, pivot_dy, pivot_char = cells[0]
+        anchor_y, anchor_x = np.divmod(self.char_positions(pivot_char), cols)
+        anchor_x -= pivot_dx
+        anchor_y -= pivot_dy
+        dxs, dys = [cell[0] for cell in cells], [cell[1] for cell in cells]
+        keep = (anchor_x >= -min(dxs)) & (anchor_x < cols - max(dxs))
+        keep &= (anchor_y >= -min(dys)) & (anchor_y < rows - max(dys))
+        anchor_x, anchor_y = anchor_x[keep], anchor_y[keep]
+
+        array = self.to_array()
+        for dx, dy, char in cells[1:]:
+            keep = array[anchor_y + dy, anchor_x + dx] == ord(char)
+            anchor_x, anchor_y = anchor_x[keep], anchor_y[keep]
+        return int(anchor_x.size)
+
+    def _reindex_cell(self, x: int, y: int, old: Any, new: Any) -> None:
+        """
+        Move a changed cell between the character index entries, and drop the
+        prefix-sum tables of both characters.
+        """
+        if self._prefix_sums is not None:
+            self._prefix_sums.pop(old, None)
+            self._prefix_sums.pop(new, None)
+        if self._char_index is None or old == new:
+            return
+        if not (isinstance(new, str) and len(new) == 1 and ord(new) <= 0xFF):
+            self._char_index = None
+            self._prefix_sums = None
+            return
+        position = y * self.get_grid_dimensions()[1] + x
+        positions = self._char_index[old]
+        index = np.searchsorted(positions, position)
+        self._char_index[old] = np.delete(positions, index)
+        positions = self.char_positions(new)
+        index = np.searchsorted(positions, position)
+        self._char_index[new] = np.insert(positions, index, position)
+
+
+@dataclass
+class Grid(GridSearchMixin):
     """
     Represents a 2D grid and provides methods for element access and modification.
 
@@ -39,6 +574,10 @@ class Grid:
     def __post_init__(self):
         self._rows = len(self.data)
         self._cols = len(self.data[0]) if self._rows > 0 else 0
+        self._array: Optional[np.ndarray] = None
+        self._line_cache: Optional[List[GridLine]] = None
+        self._char_index: Optional[Dict[str, np.ndarray]] = None
+        self._prefix_sums: Optional[Dict[str, np.ndarray]] = None
 
     @property
     def rows(self):
@@ -106,7 +645,19 @@ class Grid:
         """
         if not self.is_valid_position(x, y):
             raise ValueError(f"Invalid position: ({x}, {y})")
+        old = self.data[y][x]
         self.data[y][x] = value
+        self._line_cache = None
+        self._reindex_cell(x, y, old, value)
+        if self._array is None:
+            return
+        # Patch the cached array in place so indexed queries stay cheap after a change
+        if isinstance(value, str) and len(value) == 1 and ord(value) <= 0xFF:
+            self._array.flags.writeable = True
+            self._array[y, x] = ord(value)
+            self._array.flags.writeable = False
+        else:
+            self._array = None
 
     def check_direction(
         self, start_x: int, start_y: int, dx: int, dy: int, word: str
@@ -150,6 +701,681 @@ class Grid:
                 return False
         return True
 
+    def to_array(self) -> np.ndarray:
+        """
+        Get the grid as a 2-D uint8 array of character codes, built once and cached.
+
+        The cache is kept up to date by `set`; changes made directly to `data` are not
+        seen.
+
+        Returns:
+            np.ndarray: A read-only (rows, cols) array of Latin-1 character codes.
+
+        Raises:
+            ValueError: If the rows differ in length, or the cells are not single
+                Latin-1 characters.
+        """
+        if self._array is None:
+            _check_row_lengths(self.data, self._cols)
+            try:
+                text = "".join("".join(row) for row in self.data).encode("latin-1")
+            except (TypeError, UnicodeEncodeError) as error:
+                raise ValueError("Grid cells must be single characters") from error
+            if len(text) != self._rows * self._cols:
+                raise ValueError("Grid cells must be single characters")
+            # A bytearray lets `set` patch the otherwise read-only array
+            self._array = np.frombuffer(bytearray(text), dtype=np.uint8).reshape(
+                self._rows, self._cols
+            )
+            self._array.flags.writeable = False
+        return self._array
+
+
+class ByteGrid(GridSearchMixin):
+    """
+    A compact character grid stored in one flat uint8 buffer with a row stride.
+
+    Each cell takes one byte instead of a pointer to a str object, and rows, columns
+    and the 2-D array are zero-copy views of the buffer. The stride may exceed the
+    number of columns, for instance to skip the newline ending each row of a file.
+    The `get`/`set`/`is_valid_position`/`check_direction` API matches `Grid`.
+
+    Attributes:
+        buffer (np.ndarray): The flat uint8 buffer of Latin-1 character codes. Only
+            `set` and `set_flat` may write to it, so that cached searches stay valid.
+    """
+
+    __slots__ = (
+        "buffer",
+        "_cells",
+        "_rows",
+        "_cols",
+        "_stride",
+        "_line_cache",
+        "_char_index",
+        "_prefix_sums",
+        "_mapping",
+    )
+
+    def __init__(
+        self,
+        buffer: bytearray | bytes | memoryview | np.ndarray,
+        rows: int,
+        cols: int,
+        stride: Optional[int] = None,
+    ):
+        """
+        Wraps a buffer holding `rows` rows of `cols` cells, `stride` bytes apart.
+
+        Raises:
+            ValueError: If the buffer is too small for the given dimensions.
+        """
+        self.buffer = np.frombuffer(buffer, dtype=np.uint8)
+        # Indexing a memoryview is much cheaper than a NumPy scalar for single cells
+        self._cells = memoryview(self.buffer)
+        self._rows = rows
+        self._cols = cols
+        self._stride = cols if stride is None else stride
+        self._line_cache: Optional[List[GridLine]] = None
+        self._char_index: Optional[Dict[str, np.ndarray]] = None
+        self._prefix_sums: Optional[Dict[str, np.ndarray]] = None
+        self._mapping: Optional[mmap.mmap] = None
+        if self._stride < cols or (
+            rows and (rows - 1) * self._stride + cols > self.buffer.size
+        ):
+            raise ValueError("Buffer is too small for the grid dimensions")
+
+    @classmethod
+    def from_lines(cls, lines: Iterable[str]) -> "ByteGrid":
+        """
+        Builds a grid from lines of equal length, one byte per character.
+
+        Raises:
+            ValueError: If the lines differ in length or hold non-Latin-1 characters.
+        """
+        rows = [line.strip() for line in lines]
+        cols = len(rows[0]) if rows else 0
+        _check_row_lengths(rows, cols)
+        try:
+            buffer = bytearray("".join(rows).encode("latin-1"))
+        except UnicodeEncodeError as error:
+            raise ValueError("Grid cells must be Latin-1 characters") from error
+        return cls(buffer, len(rows), cols)
+
+    @classmethod
+    def from_file(
+        cls, file_path: str | Path, copy_on_write: bool = False
+    ) -> "ByteGrid":
+        """
+        Maps a grid file into memory without reading or copying it.
+
+        The row stride is the offset of the first newline plus one, so every row must
+        have the same length; "\\r\\n" line endings are skipped like "\\n". Cells and
+        rows are served straight from the mapping, letting the operating system page
+        in only what a search touches. The mapping stays open until `close` is called,
+        or the grid is left as a context manager.
+
+        Args:
+            file_path (str | Path): Path to the grid file.
+            copy_on_write (bool): Allow `set`, keeping the changes in private memory
+                instead of writing them to the file. A read-only grid raises TypeError
+                on `set`.
+
+        Returns:
+            ByteGrid: The grid, backed by the memory map.
+
+        Raises:
+            ValueError: If the rows of the file differ in length.
+        """
+        access = mmap.ACCESS_COPY if copy_on_write else mmap.ACCESS_READ
+        with open(file_path, "rb") as file:
+            if file.seek(0, 2) == 0:
+                return cls(bytearray(), 0, 0)
+            # The mapping stays open after the file is closed, as long as it is used
+            mapping = mmap.mmap(file.fileno(), 0, access=access)
+
+        try:
+            rows, cols, stride = _mapped_grid_shape(mapping)
+        except ValueError:
+            mapping.close()
+            raise
+        grid = cls(mapping, rows, cols, stride)
+        grid._mapping = mapping
+        return grid
+
+    @classmethod
+    def from_grid(cls, grid: Grid) -> "ByteGrid":
+        """
+        Copies a `Grid` of single-character cells into a compact grid.
+        """
+        return cls(bytearray(grid.to_array().tobytes()), grid.rows, grid.cols)
+
+    def to_grid(self) -> Grid:
+        """
+        Copies the cells back into a list-of-lists `Grid`.
+        """
+        return Grid(
+            data=[list(row.tobytes().decode("latin-1")) for row in self.to_array()]
+        )
+
+    def close(self) -> None:
+        """
+        Closes the memory map of a grid loaded with `from_file`, leaving it empty.
+
+        Does nothing for a grid that does not own a memory map.
+
+        Raises:
+            BufferError: If views of the grid, such as `to_array`, are still alive.
+        """
+        if self._mapping is None:
+            return
+        self._cells.release()
+        self.buffer = np.empty(0, dtype=np.uint8)
+        self._cells = memoryview(self.buffer)
+        self._rows = self._cols = 0
+        self._line_cache = self._char_index = self._prefix_sums = None
+        mapping, self._mapping = self._mapping, None
+        mapping.close()
+
+    def __enter__(self) -> "ByteGrid":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, ByteGrid):
+            return NotImplemented
+        return np.array_equal(self.to_array(), other.to_array())
+
+    def __repr__(self) -> str:
+        return f"ByteGrid(rows={self._rows}, cols={self._cols})"
+
+    @property
+    def rows(self):
+        return self._rows
+
+    @property
+    def cols(self):
+        return self._cols
+
+    @property
+    def stride(self):
+        return self._stride
+
+    def get_grid_dimensions(self) -> Tuple[int, int]:
+        """
+        Get the dimensions of the grid.
+
+        Returns:
+            Tuple[int, int]: A tuple containing (rows, columns)
+        """
+        return self._rows, self._cols
+
+    def is_valid_position(self, x: int, y: int) -> bool:
+        """
+        Check if the given coordinates are within the grid boundaries.
+        """
+        return 0 <= x < self._cols and 0 <= y < self._rows
+
+    def flat_index(self, x: int, y: int) -> int:
+        """
+        Get the offset of a cell in the buffer. Does not check the bounds.
+        """
+        return y * self._stride + x
+
+    def get_flat(self, index: int) -> str:
+        """
+        Get the character at a buffer offset, as returned by `flat_index`.
+        """
+        return chr(self._cells[index])
+
+    def set_flat(self, index: int, value: str) -> None:
+        """
+        Set the character at a buffer offset, as returned by `flat_index`.
+
+        The offset is converted back to (x, y) with the row stride, and the cell is
+        then set like `set` does, keeping the character index keyed by column count.
+
+        Raises:
+            ValueError: If the offset is outside the grid or in the padding between
+                rows.
+        """
+        y, x = divmod(index, self._stride)
+        if index < 0 or not self.is_valid_position(x, y):
+            raise ValueError(f"Invalid buffer offset: {index}")
+        self.set(x, y, value)
+
+    def get(self, x: int, y: int) -> str:
+        """
+        Get the character at the specified position in the grid.
+
+        Raises:
+            IndexError: If the position is outside the grid boundaries
+        """
+        if not self.is_valid_position(x, y):
+            raise IndexError(f"Position ({x}, {y}) is outside grid boundaries")
+        return chr(self._cells[y * self._stride + x])
+
+    def set(self, x: int, y: int, value: str) -> None:
+        """
+        Sets a single character in the grid at the specified coordinates.
+
+        Raises:
+            ValueError: If the position is outside the grid boundaries.
+        """
+        if not self.is_valid_position(x, y):
+            raise ValueError(f"Invalid position: ({x}, {y})")
+        index = y * self._stride + x
+        old = chr(self._cells[index])
+        self._cells[index] = ord(value)
+        self._line_cache = None
+        self._reindex_cell(x, y, old, value)
+
+    def check_direction(
+        self, start_x: int, start_y: int, dx: int, dy: int, word: str
+    ) -> bool:
+        """
+        Check if a word starts at the given position in the specified direction.
+
+        See `Grid.check_direction`. Steps through the buffer by a fixed offset.
+        """
+        end_x = start_x + (len(word) - 1) * dx
+        end_y = start_y + (len(word) - 1) * dy
+        if not (
+            self.is_valid_position(start_x, start_y)
+            and self.is_valid_position(end_x, end_y)
+        ):
+            return False
+
+        index = start_y * self._stride + start_x
+        step = dy * self._stride + dx
+        cells = self._cells
+        for char in word:
+            if cells[index] != ord(char):
+                return False
+            index += step
+        return True
+
+    def row(self, y: int) -> np.ndarray:
+        """
+        Get a zero-copy, read-only view of the cells of row `y`.
+        """
+        return self.to_array()[y]
+
+    def column(self, x: int) -> np.ndarray:
+        """
+        Get a zero-copy, read-only strided view of the cells of column `x`.
+        """
+        return self.to_array()[:, x]
+
+    def to_array(self) -> np.ndarray:
+        """
+        Get a zero-copy, read-only (rows, cols) view of the buffer.
+
+        Writes must go through `set` or `set_flat`, which keep the cached lines,
+        character index and prefix sums in step with the cells.
+        """
+        return np.lib.stride_tricks.as_strided(
+            self.buffer,
+            shape=(self._rows, self._cols),
+            strides=(self._stride, 1),
+            writeable=False,
+        )
+
+
+def _check_row_lengths(rows: Iterable[Sized], cols: int) -> None:
+    """
+    Check that every row of a grid has `cols` cells.
+
+    Raises:
+        ValueError: Naming the first row of another length.
+    """
+    for y, row in enumerate(rows):
+        if len(row) != cols:
+            raise ValueError(f"Grid row {y} has {len(row)} cells instead of {cols}")
+
+
+def _mapped_grid_shape(mapping: mmap.mmap) -> Tuple[int, int, int]:
+    """
+    Get the (rows, cols, stride) of a grid file, checking every row's line ending.
+
+    Raises:
+        ValueError: If the rows differ in length.
+    """
+    newline = mapping.find(b"\n")
+    if newline == -1:
+        return 1, len(mapping), len(mapping)
+    crlf = newline > 0 and mapping[newline - 1] == ord("\r")
+    cols = newline - 1 if crlf else newline
+    stride = newline + 1
+    rows, remainder = divmod(len(mapping), stride)
+    # The last row may not end with a newline
+    if remainder == cols and mapping[-1] != ord("\n"):
+        rows += 1
+    elif remainder:
+        raise ValueError("All grid rows must have the same length")
+
+    # Every row must end exactly at the stride, with no newline among its cells
+    data = np.frombuffer(mapping, dtype=np.uint8)
+    aligned = bool(np.all(data[newline::stride] == ord("\n")))
+    if crlf:
+        aligned = aligned and bool(np.all(data[cols::stride] == ord("\r")))
+    newlines = sum(
+        np.count_nonzero(data[start : start + SHAPE_CHECK_BYTES] == ord("\n"))
+        for start in range(0, data.size, SHAPE_CHECK_BYTES)
+    )
+    # Views of the mapping would keep it from being closed
+    del data
+    if not aligned or newlines != len(mapping) // stride:
+        raise ValueError("All grid rows must have the same length")
+    return rows, cols, stride
+
+
+def _grid_lines(array: np.ndarray) -> Iterator[GridLine]:
+    """
+    Yield every row, column, diagonal and anti-diagonal of a character array.
+    """
+    rows, cols = array.shape
+    for y in range(rows):
+        yield GridLine(array[y].tobytes().decode("latin-1"), 0, y, 1, 0)
+    for x in range(cols):
+        yield GridLine(array[:, x].tobytes().decode("latin-1"), x, 0, 0, 1)
+    flipped = array[:, ::-1]
+    for offset in range(1 - rows, cols):
+        x, y = max(offset, 0), max(-offset, 0)
+        diagonal = np.diagonal(array, offset).tobytes().decode("latin-1")
+        anti_diagonal = np.diagonal(flipped, offset).tobytes().decode("latin-1")
+        yield GridLine(diagonal, x, y, 1, 1)
+        yield GridLine(anti_diagonal, cols - 1 - x, y, -1, 1)
+
+
+def _overlaps_itself(word: str) -> bool:
+    """
+    Whether two occurrences of a word can overlap: a proper prefix is also a suffix.
+    """
+    return any(word[:size] == word[-size:] for size in range(1, len(word)))
+
+
+def _count_overlapping(text: str, word: str) -> int:
+    """
+    Count the occurrences of a word in a text, overlapping ones included.
+    """
+    count = 0
+    index = text.find(word)
+    while index != -1:
+        count += 1
+        index = text.find(word, index + 1)
+    return count
+
+
+def _stencil_match_masks(
+    array: np.ndarray,
+    stencil: Sequence[str],
+    wildcard: str = ".",
+    row_start: int = 0,
+    row_stop: Optional[int] = None,
+) -> Iterator[Tuple[int, int, np.ndarray]]:
+    """
+    Match a 2-D pattern at every anchor cell at once, ANDing shifted grid slices.
+
+    The anchor is the pattern's top-left cell. Anchor rows are processed in blocks of
+    `SEARCH_BLOCK_ROWS` to bound memory.
+
+    Args:
+        array (np.ndarray): The (rows, cols) uint8 character codes of the grid.
+        stencil (Sequence[str]): The pattern, one string per row.
+        wildcard (str): The character marking cells that match anything.
+        row_start (int): First anchor row to consider.
+        row_stop (Optional[int]): Row just past the last anchor row to consider.
+
+    Yields:
+        Tuple[int, int, np.ndarray]: The (x, y) of the block's top-left anchor, and a
+            boolean mask of the anchors in the block where the pattern matches.
+    """
+    rows, cols = array.shape
+    height, width = len(stencil), len(stencil[0])
+    row_stop = rows if row_stop is None else min(row_stop, rows)
+    cells = [
+        (dy, dx, ord(char))
+        for dy, row in enumerate(stencil)
+        for dx, char in enumerate(row)
+        if char != wildcard
+    ]
+    if any(code > 0xFF for _, _, code in cells):
+        return
+
+    x1, y1 = cols - width + 1, min(row_stop, rows - height + 1)
+    if x1 <= 0:
+        return
+    for block_start in range(row_start, y1, SEARCH_BLOCK_ROWS):
+        block_stop = min(block_start + SEARCH_BLOCK_ROWS, y1)
+        mask = np.ones((block_stop - block_start, x1), dtype=bool)
+        for dy, dx, code in cells:
+            mask &= array[block_start + dy : block_stop + dy, dx : x1 + dx] == code
+        yield 0, block_start, mask
+
+
+def _word_match_masks(
+    array: np.ndarray,
+    word: str,
+    directions: Iterable[Tuple[int, int]],
+    row_start: int = 0,
+    row_stop: Optional[int] = None,
+) -> Iterator[Tuple[Tuple[int, int], int, int, np.ndarray]]:
+    """
+    Match a word from every start cell at once by ANDing shifted slices of the grid.
+
+    For each direction, the start cells are restricted to those where the whole word
+    fits, and letter `i` is compared against the slice shifted `i` steps along it.
+    Start rows are processed in blocks of `SEARCH_BLOCK_ROWS` to bound memory.
+
+    Args:
+        array (np.ndarray): The (rows, cols) uint8 character codes of the grid.
+        word (str): The word to search for.
+        directions (Iterable[Tuple[int, int]]): The (dx, dy) steps to search along.
+        row_start (int): First row of start cells to consider.
+        row_stop (Optional[int]): Row just past the last start cell to consider.
+
+    Yields:
+        Tuple[Tuple[int, int], int, int, np.ndarray]: The direction, the (x, y) of the
+            block's top-left start cell, and a boolean mask of the matches starting in
+            it.
+    """
+    rows, cols = array.shape
+    row_stop = rows if row_stop is None else min(row_stop, rows)
+    if not word or any(ord(char) > 0xFF for char in word):
+        return
+    codes = [ord(char) for char in word]
+    reach = len(word) - 1
+
+    for dx, dy in directions:
+        x0, x1 = max(0, -dx * reach), cols - max(0, dx * reach)
+        y0, y1 = max(row_start, -dy * reach), min(row_stop, rows - max(0, dy * reach))
+        if x1 <= x0:
+            continue
+        for block_start in range(y0, y1, SEARCH_BLOCK_ROWS):
+            block_stop = min(block_start + SEARCH_BLOCK_ROWS, y1)
+            mask = np.ones((block_stop - block_start, x1 - x0), dtype=bool)
+            for i, code in enumerate(codes):
+                mask &= (
+                    array[
+                        block_start + dy * i : block_stop + dy * i,
+                        x0 + dx * i : x1 + dx * i,
+                    ]
+                    == code
+                )
+            yield (dx, dy), x0, block_start, mask
+
+
+def _band_word_counts(
+    array: np.ndarray,
+    row_start: int,
+    row_stop: int,
+    word: str,
+    directions: List[Tuple[int, int]],
+) -> Dict[Tuple[int, int], int]:
+    """
+    Count the word matches per direction that start in rows [row_start, row_stop).
+    """
+    counts = {direction: 0 for direction in directions}
+    for direction, _, _, mask in _word_match_masks(
+        array, word, directions, row_start, row_stop
+    ):
+        counts[direction] += int(np.count_nonzero(mask))
+    return counts
+
+
+def _band_stencil_count(
+    array: np.ndarray,
+    row_start: int,
+    row_stop: int,
+    variants: List[Tuple[str, ...]],
+    wildcard: str,
+) -> int:
+    """
+    Count the stencil matches anchored in rows [row_start, row_stop).
+    """
+    return sum(
+        int(np.count_nonzero(mask))
+        for variant in variants
+        for _, _, mask in _stencil_match_masks(
+            array, variant, wildcard, row_start, row_stop
+        )
+    )
+
+
+def _scan_shared_band(
+    name: str,
+    shape: Tuple[int, int],
+    scan: Callable[[np.ndarray, int, int], Any],
+    row_start: int,
+    row_stop: int,
+) -> Any:
+    """
+    Run a band scan in a worker process over the grid in shared memory.
+    """
+    shared = SharedMemory(name=name)
+    try:
+        array = np.ndarray(shape, dtype=np.uint8, buffer=shared.buf)
+        result = scan(array, row_start, row_stop)
+        # The view must go before the block can be closed
+        del array
+        return result
+    finally:
+        shared.close()
+
+
+def _scan_in_bands(
+    array: np.ndarray,
+    scan: Callable[[np.ndarray, int, int], Any],
+    workers: int = 1,
+    bands_per_worker: int = 4,
+) -> List[Any]:
+    """
+    Split a grid scan into horizontal bands and run them across processes.
+
+    `scan(array, row_start, row_stop)` must only report matches anchored in its band's
+    rows. It may read the rows below the band (the halo a match reaches into), and as
+    every match belongs to exactly one anchor row, no match is counted twice. The grid
+    is copied once into shared memory, so workers receive only its name.
+
+    Args:
+        array (np.ndarray): The (rows, cols) uint8 character codes of the grid.
+        scan (Callable[[np.ndarray, int, int], Any]): The picklable band scan.
+        workers (int): Number of worker processes. With one, the scan runs in-process.
+        bands_per_worker (int): Bands handed to each worker, to even out the load.
+
+    Returns:
+        List[Any]: The result of every band, top to bottom.
+    """
+    rows = array.shape[0]
+    band_count = min(workers * bands_per_worker, rows // MIN_BAND_ROWS)
+    if workers <= 1 or band_count <= 1:
+        return [scan(array, 0, rows)]
+    bounds = [rows * i // band_count for i in range(band_count + 1)]
+
+    shared = SharedMemory(create=True, size=array.nbytes)
+    try:
+        np.ndarray(array.shape, dtype=np.uint8, buffer=shared.buf)[:] = array
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            return list(
+                executor.map(
+                    _scan_shared_band,
+                    repeat(shared.name),
+                    repeat(array.shape),
+                    repeat(scan),
+                    bounds[:-1],
+                    bounds[1:],
+                )
+            )
+    finally:
+        shared.close()
+        shared.unlink()
+
+
+@dataclass
+class AhoCorasick:
+    """
+    An Aho-Corasick automaton that finds every occurrence of many patterns in one pass.
+
+    Attributes:
+        patterns (List[str]): The patterns to search for. Matches report their index.
+    """
+
+    patterns: List[str]
+
+    def __post_init__(self):
+        """
+        Builds the trie of patterns, then the failure links breadth-first, merging the
+        outputs of each state's failure target into its own.
+        """
+        self._goto: List[Dict[str, int]] = [{}]
+        self._fail: List[int] = [0]
+        self._output: List[List[int]] = [[]]
+
+        for index, pattern in enumerate(self.patterns):
+            state = 0
+            for char in pattern:
+                if char not in self._goto[state]:
+                    self._goto.append({})
+                    self._fail.append(0)
+                    self._output.append([])
+                    self._goto[state][char] = len(self._goto) - 1
+                state = self._goto[state][char]
+            self._output[state].append(index)
+
+        queue = deque(self._goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for char, child in self._goto[state].items():
+                queue.append(child)
+                fallback = self._fail[state]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                self._fail[child] = self._goto[fallback].get(char, 0)
+                self._output[child] += self._output[self._fail[child]]
+
+    def iter_matches(self, text: str) -> Iterator[Tuple[int, int]]:
+        """
+        Stream a text through the automaton.
+
+        Args:
+            text (str): The text to search.
+
+        Yields:
+            Tuple[int, int]: The index in `text` of the last character of a match,
+                and the index of the matched pattern.
+        """
+        goto, fail, output = self._goto, self._fail, self._output
+        state = 0
+        for position, char in enumerate(text):
+            while state and char not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(char, 0)
+            for index in output[state]:
+                yield position, index
+
 
 @dataclass
 class Range:
@@ -189,29 +1415,261 @@ class Range:
         return self.start <= value <= self.end
 
 
+class RangeSet:
+    """
+    A set of integers stored as sorted, disjoint, non-adjacent inclusive ranges.
+
+    Ranges are merged on construction, so membership is a binary search over the range
+    starts and set operations are linear merges of the two range lists. Values are
+    never expanded, so spans may be arbitrarily large.
+
+    Example:
+        >>> ranges = RangeSet([Range(10, 14), Range(16, 20), Range(12, 18)])
+        >>> list(ranges), 15 in ranges, ranges.size
+        ([Range(start=10, end=20)], True, 11)
+    """
+
+    __slots__ = ("_starts", "_ends")
+
+    def __init__(self, ranges: Iterable[Range] = ()):
+        """
+        Normalizes the ranges, dropping empty ones and merging overlapping or adjacent
+        ones.
+        """
+        starts: List[int] = []
+        ends: List[int] = []
+        for current in sorted(
+            (r for r in ranges if r.start <= r.end), key=lambda r: r.start
+        ):
+            if ends and current.start <= ends[-1] + 1:
+                ends[-1] = max(ends[-1], current.end)
+            else:
+                starts.append(current.start)
+                ends.append(current.end)
+        self._starts = starts
+        self._ends = ends
+
+    @classmethod
+    def _from_disjoint(cls, starts: List[int], ends: List[int]) -> "RangeSet":
+        """
+        Wraps bounds that are already sorted and disjoint, merging adjacent ranges.
+        """
+        result = cls()
+        for start, end in zip(starts, ends):
+            if result._ends and start <= result._ends[-1] + 1:
+                result._ends[-1] = max(result._ends[-1], end)
+            else:
+                result._starts.append(start)
+                result._ends.append(end)
+        return result
+
+    def __iter__(self) -> Iterator[Range]:
+        return map(Range, self._starts, self._ends)
+
+    def __len__(self) -> int:
+        """The number of disjoint ranges."""
+        return len(self._starts)
+
+    def __eq__(self, other: object) -> bool:
+        if not isinstance(other, RangeSet):
+            return NotImplemented
+        return self._starts == other._starts and self._ends == other._ends
+
+    def __repr__(self) -> str:
+        return f"RangeSet({list(self)})"
+
+    @property
+    def size(self) -> int:
+        """The number of integers in the set."""
+        return sum(end - start + 1 for start, end in zip(self._starts, self._ends))
+
+    def contains(self, value: int) -> bool:
+        """
+        Checks if a value lies within one of the ranges, in O(log n).
+
+        Args:
+            value (int): The value to check.
+
+        Returns:
+            bool: True if the value is in the set, False otherwise.
+        """
+        index = bisect_right(self._starts, value) - 1
+        return index >= 0 and value <= self._ends[index]
+
+    __contains__ = contains
+
+    def contains_many(self, values: np.ndarray) -> np.ndarray:
+        """
+        Checks many values at once with one `searchsorted` over the range starts.
+
+        Args:
+            values (np.ndarray): The values to check. Bounds must fit in int64.
+
+        Returns:
+            np.ndarray: A boolean mask of the values that are in the set.
+        """
+        values = np.asarray(values)
+        if not self._starts:
+            return np.zeros(values.shape, dtype=bool)
+        starts = np.array(self._starts, dtype=np.int64)
+        ends = np.array(self._ends, dtype=np.int64)
+        index = np.searchsorted(starts, values, side="right") - 1
+        return (index >= 0) & (values <= ends[np.maximum(index, 0)])
+
+    def union(self, other: "RangeSet") -> "RangeSet":
+        """
+        Get the integers in either set, merging the two sorted range lists.
+        """
+        merged = sorted(
+            zip(self._starts + other._starts, self._ends + other._ends),
+            key=lambda bounds: bounds[0],
+        )
+        return RangeSet._from_disjoint(
+            [start for start, _ in merged], [end for _, end in merged]
+        )
+
+    def intersection(self, other: "RangeSet") -> "RangeSet":
+        """
+        Get the integers in both sets, walking the two range lists together.
+        """
+        starts: List[int] = []
+        ends: List[int] = []
+        i = j = 0
+        while i < len(self._starts) and j < len(other._starts):
+            start = max(self._starts[i], other._starts[j])
+            end = min(self._ends[i], other._ends[j])
+            if start <= end:
+                starts.append(start)
+                ends.append(end)
+            # The range ending first cannot overlap anything further in the other list
+            if self._ends[i] < other._ends[j]:
+                i += 1
+            else:
+                j += 1
+        return RangeSet._from_disjoint(starts, ends)
+
+    def difference(self, other: "RangeSet") -> "RangeSet":
+        """
+        Get the integers in this set but not in the other, walking both range lists.
+        """
+        starts: List[int] = []
+        ends: List[int] = []
+        j = 0
+        for start, end in zip(self._starts, self._ends):
+            # Skip the removed ranges that end before this one starts
+            while j < len(other._starts) and other._ends[j] < start:
+                j += 1
+            k = j
+            while k < len(other._starts) and other._starts[k] <= end:
+                if other._starts[k] > start:
+                    starts.append(start)
+                    ends.append(other._starts[k] - 1)
+                start = max(start, other._ends[k] + 1)
+                k += 1
+            if start <= end:
+                starts.append(start)
+                ends.append(end)
+        return RangeSet._from_disjoint(starts, ends)
+
+    __or__ = union
+    __and__ = intersection
+    __sub__ = difference
+
+
+class IntervalTree:
+    """
+    A static interval tree answering which of many, possibly overlapping, ranges
+    contain a value or overlap a query range.
+
+    The ranges are sorted by start and laid out as an implicit balanced binary tree,
+    each node keeping the largest end in its subtree. A query skips every subtree
+    that ends before it or starts after it, so it costs O(log n) per reported range
+    instead of a scan of all of them.
+    """
+
+    __slots__ = ("_ranges", "_max_ends")
+
+    def __init__(self, ranges: Iterable[Range]):
+        self._ranges = sorted(ranges, key=lambda r: (r.start, r.end))
+        self._max_ends = [r.end for r in self._ranges]
+        self._build(0, len(self._ranges))
+
+    def _build(self, lo: int, hi: int) -> Optional[int]:
+        """
+        Fill in the largest end of the subtree over the sorted ranges [lo, hi).
+        """
+        if lo >= hi:
+            return None
+        mid = (lo + hi) // 2
+        for child_end in (self._build(lo, mid), self._build(mid + 1, hi)):
+            if child_end is not None and child_end > self._max_ends[mid]:
+                self._max_ends[mid] = child_end
+        return self._max_ends[mid]
+
+    def __len__(self) -> int:
+        return len(self._ranges)
+
+    def overlapping(self, query: Range) -> List[Range]:
+        """
+        Get the ranges sharing at least one value with the query range.
+
+        Args:
+            query (Range): The inclusive range to look up.
+
+        Returns:
+            List[Range]: The matching ranges, sorted by start.
+        """
+        found: List[int] = []
+        stack = [(0, len(self._ranges))]
+        while stack:
+            lo, hi = stack.pop()
+            if lo >= hi:
+                continue
+            mid = (lo + hi) // 2
+            if self._max_ends[mid] < query.start:
+                continue
+            stack.append((lo, mid))
+            current = self._ranges[mid]
+            if current.start <= query.end:
+                if current.end >= query.start:
+                    found.append(mid)
+                stack.append((mid + 1, hi))
+        return [self._ranges[index] for index in sorted(found)]
+
+    def stab(self, value: int) -> List[Range]:
+        """
+        Get the ranges containing a value.
+
+        Args:
+            value (int): The value to look up.
+
+        Returns:
+            List[Range]: The ranges containing it, sorted by start.
+        """
+        return self.overlapping(Range(value, value))
+
+
 @dataclass
 class TopologicalSorter:
     """
     A utility class for performing topological sorting on a directed acyclic graph (DAG).
 
+    In-degrees are not stored, since `sort` and `layers` count them within the nodes
+    they are given.
+
     Attributes:
         graph (Dict[int, List[int]]): Adjacency list representation of the graph, where
                                       each key is a node, and its value is a list of nodes
                                       it points to (its neighbors).
-        in_degree (Dict[int, int]): Tracks the in-degree (number of incoming edges) for each node.
-                                    Nodes with an in-degree of 0 have no dependencies.
     """
 
     graph: Dict[int, List[int]] = None
-    in_degree: Dict[int, int] = None
 
     def __post_init__(self):
         """
-        Initializes the graph and in-degree map as default dictionaries. The graph uses a list
-        for neighbors, and the in-degree map tracks the number of incoming edges for each node.
+        Initializes the graph as a default dictionary, with a list of neighbors per node.
         """
         self.graph = defaultdict(list)
-        self.in_degree = defaultdict(int)
 
     def add_edge(self, x: int, y: int) -> None:
         """
@@ -224,53 +1682,112 @@ class TopologicalSorter:
             y (int): The target node.
         """
         self.graph[x].append(y)  # Add `y` as a neighbor of `x`
-        self.in_degree[y] += 1  # Increment the in-degree of `y`
-        self.in_degree.setdefault(x, 0)  # Ensure `x` is in the in-degree map
+
+    def _initial_degrees(self, nodes: List[int]) -> Dict[int, int]:
+        """
+        Count the in-degree of each node within the subgraph induced by `nodes`.
+
+        The counts are built fresh for every call, leaving the sorter itself untouched,
+        and edges from or to nodes outside the list are ignored.
+
+        Raises:
+            ValueError: If a node is listed more than once.
+        """
+        in_degree = dict.fromkeys(nodes, 0)
+        if len(in_degree) != len(nodes):
+            raise ValueError("Nodes to sort must be distinct")
+        for node in in_degree:
+            for neighbor in self.graph.get(node, ()):
+                if neighbor in in_degree:
+                    in_degree[neighbor] += 1
+        return in_degree
 
     def sort(self, nodes: List[int]) -> List[int]:
         """
         Performs topological sorting on the graph to determine a valid ordering of nodes.
 
         The sorting respects all dependencies, ensuring that for every edge `x -> y`,
-        node `x` appears before node `y` in the output.
+        node `x` appears before node `y` in the output. The in-degrees are counted
+        afresh within the given nodes, so one sorter can sort any number of node lists.
 
         Args:
             nodes (List[int]): The list of all nodes to sort. Nodes not in this list are ignored.
 
         Returns:
-            List[int]: The nodes sorted in topological order. If there are multiple valid orders,
-                       the result will be deterministic due to sorting.
+            List[int]: The nodes sorted in topological order. If there are multiple
+                valid orders, the smallest available node always comes first, so the
+                result is the lexicographically smallest order.
 
         Raises:
-            ValueError: If the graph contains a cycle, making topological sorting impossible.
+            ValueError: If the graph contains a cycle, making topological sorting impossible,
+                or a node is listed more than once.
 
         Algorithm:
-        - Build a queue of nodes with in-degree 0 (nodes with no dependencies).
-        - Iteratively process each node from the queue:
+        - Build a min-heap of nodes with in-degree 0 (nodes with no dependencies).
+        - Iteratively pop the smallest node from the heap:
             - Add it to the sorted result.
             - Decrement the in-degree of its neighbors.
-            - Add neighbors with in-degree 0 to the queue.
+            - Push neighbors with in-degree 0 to the heap.
         - If the total processed nodes is less than the total input nodes, a cycle exists.
         """
-        # Find all nodes with zero in-degree and initialize the processing queue
-        queue = deque(sorted(node for node in nodes if self.in_degree[node] == 0))
+        in_degree = self._initial_degrees(nodes)
+        # A heap pops the smallest ready node in O(log V), so the order is deterministic
+        heap = [node for node, degree in in_degree.items() if degree == 0]
+        heapq.heapify(heap)
         sorted_nodes = []  # To store the topological order
 
-        while queue:
-            # Process the next node in the queue
-            node = queue.popleft()
+        while heap:
+            node = heapq.heappop(heap)
             sorted_nodes.append(node)
 
-            # Decrease the in-degree of all neighbors
-            for neighbor in self.graph[node]:
-                self.in_degree[neighbor] -= 1
-                # If a neighbor now has zero in-degree, add it to the queue
-                if self.in_degree[neighbor] == 0:
-                    queue.append(neighbor)
-                    queue = deque(sorted(queue))  # Maintain deterministic order
+            # Decrease the in-degree of all neighbors being sorted
+            for neighbor in self.graph.get(node, ()):
+                if neighbor in in_degree:
+                    in_degree[neighbor] -= 1
+                    if in_degree[neighbor] == 0:
+                        heapq.heappush(heap, neighbor)
 
         # If not all nodes are in the sorted list, a cycle exists in the graph
-        if len(sorted_nodes) != len(nodes):
+        if len(sorted_nodes) != len(in_degree):
             raise ValueError("Cycle detected in the graph")
 
         return sorted_nodes
+
+    def layers(self, nodes: List[int]) -> List[List[int]]:
+        """
+        Groups the nodes into layers that can be processed in parallel.
+
+        The first layer holds the nodes without dependencies, and each following layer
+        the nodes whose dependencies all lie in earlier layers.
+
+        Args:
+            nodes (List[int]): The nodes to group. Nodes not in this list are ignored.
+
+        Returns:
+            List[List[int]]: The layers in order, each one sorted.
+
+        Raises:
+            ValueError: If the graph contains a cycle, so no layering exists, or a node
+                is listed more than once.
+        """
+        in_degree = self._initial_degrees(nodes)
+        layer = sorted(node for node, degree in in_degree.items() if degree == 0)
+        layers = []
+        processed = 0
+
+        while layer:
+            layers.append(layer)
+            processed += len(layer)
+            next_layer = []
+            for node in layer:
+                for neighbor in self.graph.get(node, ()):
+                    if neighbor in in_degree:
+                        in_degree[neighbor] -= 1
+                        if in_degree[neighbor] == 0:
+                            next_layer.append(neighbor)
+            layer = sorted(next_layer)
+
+        if processed != len(in_degree):
+            raise ValueError("Cycle detected in the graph")
+
+        return layers
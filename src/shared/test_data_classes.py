@@ -0,0 +1,203 @@
+import pytest
+import random
+from typing import List
+import numpy as np
+from shared.data_classes import (
+    IntervalTree,
+    Point,
+    PointArray,
+    Range,
+    RangeSet,
+    TopologicalSorter,
+)
+from shared.utils import neighbors
+
+
+def test_point_is_hashable_and_frozen() -> None:
+    """
+    Test that points can be used in sets and cannot be changed in place.
+    """
+    visited = {Point(1, 2), Point(1, 2) + Point(0, 0), Point(2, 1)}
+    assert visited == {Point(1, 2), Point(2, 1)}
+    assert Point(4, 6) - Point(3, 4) == Point(1, 2)
+    with pytest.raises(AttributeError):
+        Point(1, 2).x = 3
+    assert not hasattr(Point(1, 2), "__dict__")
+
+
+def test_point_array_arithmetic_and_bounds() -> None:
+    """
+    Test vectorized add/sub, indexing and bounds masks against single points.
+    """
+    points = [Point(0, 0), Point(3, 1), Point(-1, 2), Point(2, 5)]
+    array = PointArray.from_points(points)
+    shifted = array + Point(1, -1)
+    assert list(shifted) == [point + Point(1, -1) for point in points]
+    assert list(shifted - array) == [Point(1, -1)] * 4
+    assert array[1] == Point(3, 1)
+    assert array.in_bounds(cols=4, rows=3).tolist() == [True, True, False, False]
+    assert list(array[array.in_bounds(4, 3)]) == points[:2]
+    assert array.flat_indices(cols=4)[:2].tolist() == [0, 7]
+    with pytest.raises(ValueError):
+        PointArray(np.zeros(2), np.zeros(3))
+
+
+@pytest.mark.parametrize("include_diagonals", [False, True])
+def test_point_array_neighbors(include_diagonals: bool) -> None:
+    """
+    Test bulk neighbour generation against shared.utils.neighbors.
+    """
+    frontier = PointArray.from_points([(0, 0), (5, 7)])
+    expected = [
+        Point(*cell)
+        for point in frontier
+        for cell in neighbors(point.x, point.y, include_diagonals)
+    ]
+    assert list(frontier.neighbors(include_diagonals)) == expected
+
+
+def test_point_array_unique() -> None:
+    """
+    Test that duplicate points of a frontier are dropped.
+    """
+    frontier = PointArray.from_points([(1, 1), (0, 2), (1, 1), (0, 0)])
+    assert list(frontier.unique()) == [Point(0, 0), Point(1, 1), Point(0, 2)]
+    assert len(PointArray.from_points([]).unique()) == 0
+
+
+def random_ranges(rng: random.Random, count: int, span: int = 60) -> List[Range]:
+    """
+    Build random inclusive ranges, some of them empty, for comparing against sets.
+    """
+    ranges = []
+    for _ in range(count):
+        start = rng.randrange(span)
+        ranges.append(Range(start, start + rng.randrange(-2, 12)))
+    return ranges
+
+
+def expand(ranges: List[Range]) -> set:
+    """
+    Reference expansion of small ranges into a set of integers.
+    """
+    return {value for r in ranges for value in range(r.start, r.end + 1)}
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_range_set_matches_python_sets(seed: int) -> None:
+    """
+    Test normalization, membership and set operations against expanded sets.
+    """
+    rng = random.Random(seed)
+    first_ranges, second_ranges = random_ranges(rng, 8), random_ranges(rng, 8)
+    first, second = RangeSet(first_ranges), RangeSet(second_ranges)
+    first_values, second_values = expand(first_ranges), expand(second_ranges)
+
+    bounds = list(zip([r.start for r in first], [r.end for r in first]))
+    assert all(end + 1 < start for (_, end), (start, _) in zip(bounds, bounds[1:]))
+    assert first.size == len(first_values)
+    values = np.arange(-5, 80)
+    assert first.contains_many(values).tolist() == [v in first_values for v in values]
+    assert all((v in first) == (v in first_values) for v in range(-5, 80))
+
+    assert expand(list(first | second)) == first_values | second_values
+    assert expand(list(first & second)) == first_values & second_values
+    assert expand(list(first - second)) == first_values - second_values
+    assert first | second == RangeSet(first_ranges + second_ranges)
+
+
+def test_range_set_huge_spans() -> None:
+    """
+    Test that huge ranges are handled by their bounds, never expanded.
+    """
+    ranges = RangeSet([Range(0, 10**15), Range(10**15 + 1, 2 * 10**15)])
+    assert list(ranges) == [Range(0, 2 * 10**15)]
+    holes = ranges - RangeSet([Range(5, 5), Range(10**12, 10**13)])
+    assert len(holes) == 3
+    assert holes.size == ranges.size - 1 - (10**13 - 10**12 + 1)
+    assert holes.contains_many(np.array([4, 5, 6, 10**12])).tolist() == [
+        True,
+        False,
+        True,
+        False,
+    ]
+    assert RangeSet().contains_many(np.array([1])).tolist() == [False]
+
+
+@pytest.mark.parametrize("seed", range(5))
+def test_interval_tree_matches_scan(seed: int) -> None:
+    """
+    Test stabbing and overlap queries against checking every range.
+    """
+    rng = random.Random(seed)
+    ranges = [r for r in random_ranges(rng, 200, span=500) if r.start <= r.end]
+    tree = IntervalTree(ranges)
+    ordered = sorted(ranges, key=lambda r: (r.start, r.end))
+    for value in range(-3, 520, 7):
+        assert tree.stab(value) == [r for r in ordered if r.contains(value)]
+    for _ in range(50):
+        start = rng.randrange(-10, 510)
+        query = Range(start, start + rng.randrange(30))
+        assert tree.overlapping(query) == [r for r in ordered if r.overlaps(query)]
+    assert IntervalTree([]).stab(3) == []
+
+
+def test_topological_sorter_is_reusable() -> None:
+    """
+    Test that sorting leaves the sorter untouched, so it can sort again.
+    """
+    sorter = TopologicalSorter()
+    for x, y in [(1, 2), (1, 3), (2, 4), (3, 4), (5, 4)]:
+        sorter.add_edge(x, y)
+    assert sorter.sort([4, 3, 2, 1, 5]) == [1, 2, 3, 5, 4]
+    assert sorter.sort([4, 3, 2, 1, 5]) == [1, 2, 3, 5, 4]
+    assert sorter.sort([4, 2, 1]) == [1, 2, 4]
+    assert sorter.layers([4, 3, 2, 1, 5]) == [[1, 5], [2, 3], [4]]
+
+    sorter.add_edge(4, 1)
+    with pytest.raises(ValueError):
+        sorter.sort([1, 2, 3, 4, 5])
+    with pytest.raises(ValueError):
+        sorter.layers([1, 2, 3, 4, 5])
+
+
+def test_topological_sorter_rejects_duplicate_nodes() -> None:
+    """
+    Test that a node listed twice raises instead of being collapsed into one.
+    """
+    sorter = TopologicalSorter()
+    sorter.add_edge(1, 2)
+    with pytest.raises(ValueError, match="distinct"):
+        sorter.sort([2, 1, 2])
+    with pytest.raises(ValueError, match="distinct"):
+        sorter.layers([1, 1])
+
+
+def test_topological_sorter_orders_random_dags() -> None:
+    """
+    Test the heap order on random DAGs: every edge respected, smallest ready node first.
+    """
+    rng = random.Random(5)
+    for _ in range(20):
+        ranks = list(range(30))
+        rng.shuffle(ranks)
+        edges = {
+            (a, b)
+            for a, b in (rng.sample(range(30), 2) for _ in range(60))
+            if ranks[a] < ranks[b]
+        }
+        sorter = TopologicalSorter()
+        for x, y in edges:
+            sorter.add_edge(x, y)
+        order = sorter.sort(list(range(30)))
+        position = {node: i for i, node in enumerate(order)}
+        assert sorted(order) == list(range(30))
+        assert all(position[x] < position[y] for x, y in edges)
+        # Greedy check: each node is the smallest one whose predecessors all came before
+        for i, node in enumerate(order):
+            ready = {
+                n for n in order[i:] if all(position[x] < i for x, y in edges if y == n)
+            }
+            assert node == min(ready)
+        layers = sorter.layers(list(range(30)))
+        assert sorted(n for layer in layers for n in layer) == list(range(30))
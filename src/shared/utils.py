@@ -1,9 +1,39 @@
 # from math import gcd
 from math import lcm
-from functools import reduce
-from typing import Callable, List, Tuple, Optional, Any
+from functools import lru_cache, reduce
+from typing import (
+    TYPE_CHECKING,
+    Any,
+    Callable,
+    Dict,
+    Iterator,
+    List,
+    Mapping,
+    Optional,
+    Sequence,
+    Tuple,
+)
 from collections import deque
 import re
+import time
+
+if TYPE_CHECKING:
+    import mmap
+
+# Every (dx, dy) step to a neighbouring cell, diagonals included
+EIGHT_DIRECTIONS: Tuple[Tuple[int, int], ...] = (
+    (-1, -1),
+    (0, -1),
+    (1, -1),
+    (-1, 0),
+    (1, 0),
+    (-1, 1),
+    (0, 1),
+    (1, 1),
+)
+# The (dx, dy) offsets used by `neighbors`, in the order it lists them
+CARDINAL_OFFSETS: Tuple[Tuple[int, int], ...] = ((-1, 0), (1, 0), (0, -1), (0, 1))
+DIAGONAL_OFFSETS: Tuple[Tuple[int, int], ...] = ((-1, -1), (-1, 1), (1, -1), (1, 1))
 
 
 def parse_input(file_path: str) -> List[str]:
@@ -60,14 +90,9 @@ def neighbors(x: int, y: int, include_diagonals: bool = False) -> List[Tuple[int
     Returns:
         List[Tuple[int, int]]: List of neighboring coordinates.
     """
-    offsets = [
-        (-1, 0),
-        (1, 0),
-        (0, -1),
-        (0, 1),  # Cardinal directions
-    ]
+    offsets = CARDINAL_OFFSETS
     if include_diagonals:
-        offsets += [(-1, -1), (-1, 1), (1, -1), (1, 1)]
+        offsets += DIAGONAL_OFFSETS
     return [(x + dx, y + dy) for dx, dy in offsets]
 
 
@@ -113,6 +138,14 @@ def bfs(
     return None
 
 
+@lru_cache(maxsize=256)
+def _compile_pattern(pattern: str | bytes, flags: int = 0) -> re.Pattern:
+    """
+    Compiles a regular expression once and reuses it on later calls.
+    """
+    return re.compile(pattern, flags)
+
+
 def extract_pattern(
     text: str, pattern: str, transform: Callable[[tuple[str, ...]], Any] = lambda x: x
 ) -> list[Any]:
@@ -127,13 +160,236 @@ def extract_pattern(
     Returns:
         list[Any]: A list of transformed matches.
     """
-    compiled_pattern = re.compile(pattern)
-    matches = compiled_pattern.findall(text)
+    matches = _compile_pattern(pattern).findall(text)
     return [transform(match) for match in matches]
 
 
+# A pattern on its own, or a (pattern, handler) pair to transform its matches
+PatternSpec = str | bytes | Tuple[str | bytes, Callable[[Any], Any]]
+
+
+@lru_cache(maxsize=128)
+def _compile_scanner(
+    patterns: Tuple[str | bytes, ...], flags: int = 0
+) -> Tuple[re.Pattern, Dict[int, Tuple[int, int]]]:
+    """
+    Combines several patterns into one alternation, each wrapped in its own group.
+
+    Args:
+        patterns (Tuple[str | bytes, ...]): The patterns, in priority order.
+        flags (int): Regular expression flags for the combined pattern.
+
+    Returns:
+        Tuple[re.Pattern, Dict[int, Tuple[int, int]]]: The combined pattern, and for
+            the group index wrapping each pattern, that pattern's position and the
+            number of groups it defines itself.
+    """
+    groups: Dict[int, Tuple[int, int]] = {}
+    group_index = 1
+    for position, pattern in enumerate(patterns):
+        inner_groups = _compile_pattern(pattern, flags).groups
+        groups[group_index] = (position, inner_groups)
+        group_index += 1 + inner_groups
+
+    if patterns and isinstance(patterns[0], bytes):
+        combined = b"|".join(b"(" + pattern + b")" for pattern in patterns)
+    else:
+        combined = "|".join(f"({pattern})" for pattern in patterns)
+    return re.compile(combined, flags), groups
+
+
+def _pattern_sources(
+    patterns: Mapping[str, PatternSpec], binary: bool
+) -> Tuple[List[str], Tuple[str | bytes, ...], List[Optional[Callable[[Any], Any]]]]:
+    """
+    Splits named pattern specs into their names, sources and handlers, in order.
+
+    For binary inputs, `str` patterns are encoded as UTF-8.
+    """
+    names: List[str] = []
+    sources: List[str | bytes] = []
+    handlers: List[Optional[Callable[[Any], Any]]] = []
+    for name, spec in patterns.items():
+        pattern, handler = spec if isinstance(spec, tuple) else (spec, None)
+        if binary and isinstance(pattern, str):
+            pattern = pattern.encode()
+        names.append(name)
+        sources.append(pattern)
+        handlers.append(handler)
+    return names, tuple(sources), handlers
+
+
+def compile_patterns(
+    patterns: Mapping[str, PatternSpec], binary: bool = False, flags: int = 0
+) -> Tuple[re.Pattern, Dict[int, str]]:
+    """
+    Compiles named patterns into the alternation that `extract_patterns` scans with.
+
+    For callers that need the match objects themselves, e.g. for their offsets. Each
+    pattern is wrapped in its own group, which closes last and is therefore the
+    match's `lastindex`; the pattern's own groups directly follow that index.
+
+    Args:
+        patterns (Mapping[str, PatternSpec]): Token names mapped to a pattern, or to a
+            (pattern, handler) pair. Handlers are ignored.
+        binary (bool): Compile for bytes-like inputs, encoding `str` patterns.
+        flags (int): Regular expression flags for the combined pattern.
+
+    Returns:
+        Tuple[re.Pattern, Dict[int, str]]: The combined pattern, and the token name of
+            the pattern wrapped by each group index.
+    """
+    names, sources, _ = _pattern_sources(patterns, binary)
+    scanner, groups = _compile_scanner(sources, flags)
+    return scanner, {outer: names[position] for outer, (position, _) in groups.items()}
+
+
+# One element of a pattern that `compile_prefix_pattern` supports: a character, an
+# escape or a character class, optionally repeated, or such an element in a group
+_PREFIX_ATOM = r"(?:\\.|\[(?:[^\]\\]|\\.)+\]|[^\\()\[\]|{}*+?^$])[*+]?"
+_PREFIX_ELEMENT = re.compile(rf"{_PREFIX_ATOM}|\({_PREFIX_ATOM}\)")
+
+
+def compile_prefix_pattern(
+    patterns: Mapping[str, PatternSpec], binary: bool = False, flags: int = 0
+) -> re.Pattern:
+    """
+    Compiles a pattern that matches every non-empty prefix of the named patterns' tokens.
+
+    For scanners over chunked input, to recognize a token cut off by the end of a
+    chunk. Each pattern must be a sequence of characters, escapes or character
+    classes, each optionally repeated with `*` or `+` or wrapped in a group of its own,
+    since a prefix of any such element is matched by the element itself or is empty.
+    The prefixes are then nested optional groups, e.g. `a(?:b(?:c)?)?`.
+
+    Args:
+        patterns (Mapping[str, PatternSpec]): Token names mapped to a pattern, or to a
+            (pattern, handler) pair. Handlers are ignored.
+        binary (bool): Compile for bytes-like inputs, encoding `str` patterns.
+        flags (int): Regular expression flags for the combined pattern.
+
+    Returns:
+        re.Pattern: The alternation of the prefix patterns, to use with `fullmatch`.
+
+    Raises:
+        ValueError: If a pattern uses syntax other than those elements.
+    """
+    _, sources, _ = _pattern_sources(patterns, binary)
+    alternatives: List[str] = []
+    for source in sources:
+        text = source.decode() if isinstance(source, bytes) else source
+        elements = _PREFIX_ELEMENT.findall(text)
+        if not elements or "".join(elements) != text:
+            raise ValueError(f"Cannot derive the prefixes of {text!r}")
+        prefix = ""
+        for element in reversed(elements[1:]):
+            prefix = f"(?:{element}{prefix})?"
+        alternatives.append(elements[0] + prefix)
+
+    combined = "|".join(alternatives)
+    return re.compile(combined.encode() if binary else combined, flags)
+
+
+def extract_patterns(
+    text: "str | bytes | mmap.mmap",
+    patterns: Mapping[str, PatternSpec],
+    flags: int = 0,
+) -> Iterator[Tuple[str, Any]]:
+    """
+    Scans a text once for several kinds of tokens, yielding them lazily in text order.
+
+    The patterns are combined into a single alternation, compiled once and cached, so
+    any number of token kinds cost one pass. Each match is reported like `findall`
+    would: the whole match for a pattern without groups, the group for a pattern with
+    one, and a tuple of groups otherwise. When patterns match at the same position,
+    the first one in `patterns` wins. Numbered backreferences inside the patterns are
+    not supported, since their groups are renumbered in the combined pattern.
+
+    Args:
+        text (str | bytes | mmap.mmap): The input to scan. For bytes-like inputs such as
+            memory-mapped files, `str` patterns are encoded as UTF-8.
+        patterns (Mapping[str, PatternSpec]): Token names mapped to a pattern, or to a
+            (pattern, handler) pair whose handler transforms each match.
+        flags (int): Regular expression flags for the combined pattern.
+
+    Yields:
+        Tuple[str, Any]: The token name and its (transformed) match.
+
+    Example:
+        >>> patterns = {"num": ("[0-9]+", int), "word": "[a-z]+"}
+        >>> list(extract_patterns("ab 12 c 3", patterns))
+        [('word', 'ab'), ('num', 12), ('word', 'c'), ('num', 3)]
+    """
+    names, sources, handlers = _pattern_sources(patterns, not isinstance(text, str))
+    scanner, groups = _compile_scanner(sources, flags)
+    for match in scanner.finditer(text):
+        # The wrapping group closes last, so it is always the match's `lastindex`
+        outer = match.lastindex
+        position, inner_groups = groups[outer]
+        if inner_groups == 0:
+            value = match.group(outer)
+        elif inner_groups == 1:
+            value = match.group(outer + 1)
+        else:
+            value = match.group(*range(outer + 1, outer + 1 + inner_groups))
+
+        handler = handlers[position]
+        yield names[position], value if handler is None else handler(value)
+
+
 def convert_str_tuple_to_int(match: tuple[str, str]) -> tuple[int, int]:
     """
     Transform regex match tuples into integers.
     """
     return int(match[0]), int(match[1])
+
+
+def stencil_variants(
+    stencil: Sequence[str], rotate: bool = False, reflect: bool = False
+) -> List[Tuple[str, ...]]:
+    """
+    List the distinct orientations of a 2-D pattern.
+
+    Args:
+        stencil (Sequence[str]): The pattern, one string per row.
+        rotate (bool): Include the rotations by 90, 180 and 270 degrees.
+        reflect (bool): Include the mirror image of every orientation.
+
+    Returns:
+        List[Tuple[str, ...]]: The distinct orientations, the original one first.
+
+    Raises:
+        ValueError: If the pattern is empty or its rows differ in length.
+    """
+    if not stencil or not stencil[0] or len(set(map(len, stencil))) != 1:
+        raise ValueError("A stencil must be a non-empty rectangle of characters")
+
+    variants = [tuple(stencil)]
+    if rotate:
+        for _ in range(3):
+            # Rotate clockwise: the bottom row becomes the first column, read upwards
+            previous = variants[-1]
+            variants.append(
+                tuple(
+                    "".join(row[col] for row in reversed(previous))
+                    for col in range(len(previous[0]))
+                )
+            )
+    if reflect:
+        variants += [tuple(row[::-1] for row in variant) for variant in variants]
+    return list(dict.fromkeys(variants))
+
+
+def time_call(function: Callable[[], Any]) -> float:
+    """
+    Measure one call of a function, for the benchmarks.
+
+    Args:
+        function (Callable[[], Any]): The call to time. Its result is discarded.
+
+    Returns:
+        float: The wall-clock seconds the call took.
+    """
+    start = time.perf_counter()
+    function()
+    return time.perf_counter() - start